@@ -1,4 +1,7 @@
-import yfinance as yf
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+import price_store
 import matplotlib.pyplot as plt
 
 def plot_stock_price_trend(ticker, stock_data):
@@ -48,7 +51,7 @@ def main():
     ticker = input("Enter the ticker: ")
 
     # Fetch stock price data using yfinance
-    stock_data = yf.download(ticker, start='2010-01-01', end='2023-01-01')
+    stock_data = price_store.download(ticker, start='2010-01-01', end='2023-01-01')
 
     # Plot basic statistics
     plot_stock_price_trend(ticker, stock_data)
@@ -0,0 +1,105 @@
+"""
+Benchmark pick_cheapest against the groupby.apply version it replaced, on synthetic results.
+
+Each size builds rows for many ZIPs, items, stores and runs (dates), with some unpriced rows and some
+items no store could price, checks that both versions give the same summary and prints their times.
+The apply version is only timed up to --apply-max-rows, since it gets slow well before a million rows.
+
+    python bench_cheapest.py
+    python bench_cheapest.py --rows 100000 1000000 5000000 --apply-max-rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from grocery_price_compare import STORE_LABELS, pick_cheapest
+
+UNITS = ["per_gal", "per_lb", "per_oz", "per_count"]
+
+
+def pick_cheapest_apply(df: pd.DataFrame) -> pd.DataFrame:
+    """pick_cheapest as it was: a Python function per item group, then a pivot_table merged back."""
+    if df.empty:
+        return df
+
+    def _pick(group: pd.DataFrame) -> pd.Series:
+        g = group.dropna(subset=["normalized_price"]).sort_values("normalized_price")
+        if g.empty:
+            return pd.Series({"cheapest_store": None, "cheapest_name": None, "cheapest_price": None, "cheapest_url": None})
+        row = g.iloc[0]
+        return pd.Series({"cheapest_store": row["store"], "cheapest_name": row["name"],
+                          "cheapest_price": row["normalized_price"], "cheapest_url": row["url"]})
+
+    summary = df.groupby(["zip_code", "query", "normalized_to"]).apply(_pick, include_groups=False).reset_index()
+    pivot = df.pivot_table(index=["zip_code", "query", "normalized_to"], columns="store", values="normalized_price", aggfunc="min")
+    out = summary.merge(pivot, on=["zip_code", "query", "normalized_to"], how="left")
+    return out.sort_values(["zip_code", "query"]).reset_index(drop=True)
+
+
+def as_objects(df: pd.DataFrame) -> pd.DataFrame:
+    """Every missing value as None, so a NaN in one version matches a None in the other."""
+    return df.astype(object).where(df.notna(), None)
+
+
+def make_results(rows: int, zips: int, runs: int, seed: int = 0) -> pd.DataFrame:
+    """About rows results: every store for each (ZIP, item) over runs dates, prices in cents so ties are rare."""
+    rng = np.random.default_rng(seed)
+    stores = np.array(list(STORE_LABELS.values()), dtype=object)
+    items = max(1, rows // (zips * runs * len(stores)))
+    n = zips * items * runs * len(stores)
+    item = np.tile(np.repeat(np.arange(items), runs * len(stores)), zips)
+    price = rng.integers(100, 100_000, n) / 100.0
+    price[rng.random(n) < 0.05] = np.nan
+    # Every 50th item has no price anywhere
+    price[item % 50 == 49] = np.nan
+    df = pd.DataFrame({
+        "zip_code": np.repeat([f"{98000 + z:05d}" for z in range(zips)], items * runs * len(stores)),
+        "store": np.tile(stores, zips * items * runs),
+        "query": pd.Series(item).map("item {}".format).to_numpy(dtype=object),
+        "name": rng.integers(0, 10**9, n).astype(str).astype(object),
+        "normalized_price": price,
+        "normalized_to": np.array(UNITS, dtype=object)[item % len(UNITS)],
+        "url": "https://example.com/p",
+        "fetched_at": np.tile(np.repeat(pd.date_range("2025-01-01", periods=runs).to_numpy(), len(stores)), zips * items),
+    })
+    # Results arrive in no particular order
+    return df.sample(frac=1, random_state=seed).reset_index(drop=True)
+
+
+def timed(function, df: pd.DataFrame):
+    start = time.perf_counter()
+    out = function(df)
+    return out, time.perf_counter() - start
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark pick_cheapest against the groupby.apply version.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Result rows per run")
+    parser.add_argument("--zips", type=int, default=20, help="ZIP codes in the results")
+    parser.add_argument("--runs", type=int, default=5, help="Dates each (ZIP, item, store) was priced on")
+    parser.add_argument("--apply-max-rows", type=int, default=200_000, help="Largest size to time the apply version at")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    print(f"{'rows':>10} {'items':>10} {'apply s':>9} {'vectorized s':>13} {'speedup':>8}")
+    for rows in args.rows:
+        df = make_results(rows, args.zips, args.runs)
+        new, new_s = timed(pick_cheapest, df)
+        old_s = None
+        if len(df) <= args.apply_max_rows:
+            old, old_s = timed(pick_cheapest_apply, df)
+            pd.testing.assert_frame_equal(as_objects(new), as_objects(old), check_dtype=False)
+        old_text = f"{old_s:9.2f}" if old_s is not None else f"{'-':>9}"
+        speedup = f"{old_s / new_s:7.1f}x" if old_s is not None else f"{'-':>8}"
+        print(f"{len(df):>10,} {len(new):>10,} {old_text} {new_s:13.2f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
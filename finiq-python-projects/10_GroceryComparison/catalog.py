@@ -0,0 +1,66 @@
+"""
+Item catalogs and store locations for grocery_price_compare.py, read from CSV or YAML.
+
+Items (--items): one row per product to search for
+    name,normalize_to
+    whole milk 1 gallon,per_gal
+    bananas,per_lb
+
+Locations (--locations): one row per ZIP to price in; latitude/longitude are optional and set the
+geolocation the browser reports
+    zip,city,state,latitude,longitude
+    98109,Seattle,WA,47.620,-122.339
+
+YAML files hold the same fields as a list, either at the top level or under an "items" /
+"locations" key.
+"""
+
+from __future__ import annotations
+
+import csv
+import os
+from typing import Dict, List
+
+NORMALIZE_TARGETS = {"per_lb", "per_oz", "per_count", "per_gal", "per_l"}
+
+
+def read_rows(path: str, key: str) -> List[Dict]:
+    if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+        import yaml
+
+        with open(path) as file:
+            data = yaml.safe_load(file) or []
+        rows = data.get(key, []) if isinstance(data, dict) else data
+    else:
+        with open(path, newline="") as file:
+            rows = list(csv.DictReader(file))
+    return [{name.strip(): value.strip() if isinstance(value, str) else value for name, value in row.items() if name}
+            for row in rows]
+
+
+def load_items(path: str) -> List[Dict]:
+    items = []
+    seen = set()
+    for number, row in enumerate(read_rows(path, "items"), start=1):
+        name, target = row.get("name"), row.get("normalize_to")
+        if not name or target not in NORMALIZE_TARGETS:
+            raise ValueError(f"{path}: item {number} needs a name and normalize_to in {sorted(NORMALIZE_TARGETS)}")
+        # The search text is the cache key, so duplicates would only be searched twice
+        if name.lower() not in seen:
+            seen.add(name.lower())
+            items.append({"name": name, "normalize_to": target})
+    return items
+
+
+def load_locations(path: str) -> List[Dict]:
+    locations = []
+    for number, row in enumerate(read_rows(path, "locations"), start=1):
+        zip_code = str(row.get("zip") or "").strip()
+        if not zip_code:
+            raise ValueError(f"{path}: location {number} has no zip")
+        location = {"zip": zip_code.zfill(5), "city": row.get("city") or "", "state": row.get("state") or ""}
+        if row.get("latitude") not in (None, "") and row.get("longitude") not in (None, ""):
+            location["latitude"] = float(row["latitude"])
+            location["longitude"] = float(row["longitude"])
+        locations.append(location)
+    return locations
@@ -0,0 +1,278 @@
+"""
+Local stand-ins for each store's search results page, for exercising the scrapers offline.
+
+Every store gets a page built from its own card markup (the same selectors the search_* functions
+read) listing the FIXTURE_PRODUCTS catalog, served under /<store>/... on a local HTTP server. Like a
+real search, products matching the query come first, under any related sponsored FIXTURE_DECOYS:
+
+    python fixture_server.py --port 8765
+    python grocery_price_compare.py --fixtures http://127.0.0.1:8765
+
+or in-process with serve_fixtures(), which yields the root URL (fixture_urls() turns it into each
+store's site and API URL). The JSON search APIs store_api.py calls are served under /api/<store>,
+and the Walmart page embeds its results as __NEXT_DATA__ like the real one.
+
+Like the real sites, the cards are rendered by script a moment after the page loads (render_ms), and
+every page pulls in slow images, a web font and ad/tracker scripts from /static/. The server counts
+every /static/ request it answers (FixtureHandler.static_hits), which shows what request blocking saved.
+"""
+
+from __future__ import annotations
+
+import argparse
+import collections
+import contextlib
+import functools
+import html
+import json
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Tuple
+
+# (name, shelf price, unit price text); stores scale the price slightly so they differ
+FIXTURE_PRODUCTS: List[Tuple[str, float, str]] = [
+    ("Bananas, each (about 0.4 lb)", 0.25, "$0.62/lb"),
+    ("Honeycrisp Apples 3 lb bag", 5.99, "$2.00/lb"),
+    ("Roma Tomatoes 1 lb", 1.49, "$1.49/lb"),
+    ("Yellow Onions 3 lb bag", 2.99, "$1.00/lb"),
+    ("Russet Potatoes 5 lb", 3.99, "$0.80/lb"),
+    ("Whole Milk 1 gallon", 3.79, "$3.79/gal"),
+    ("Large Grade A Eggs 12 ct", 3.49, "$0.29/ct"),
+    ("White Sandwich Bread 20 oz loaf", 1.99, "$1.99/each"),
+    ("Unsalted Butter 1 lb", 4.99, "$4.99/lb"),
+    ("Sharp Cheddar Cheese 8 oz", 2.79, "$0.35/oz"),
+    ("Plain Whole Milk Yogurt 32 oz", 3.29, "$0.10/oz"),
+    ("Corn Flakes Cereal 12 oz", 3.49, "$0.29/oz"),
+    ("Long Grain White Rice 5 lb", 4.49, "$0.90/lb"),
+    ("All-Purpose Flour 5 lb", 3.29, "$0.66/lb"),
+    ("Granulated Sugar 4 lb", 3.59, "$0.90/lb"),
+    ("Iodized Salt 26 oz", 1.19, "$0.05/oz"),
+    ("Extra Virgin Olive Oil 48 oz", 14.99, "$0.31/oz"),
+    ("Medium Roast Ground Coffee 12 oz", 7.99, "$0.67/oz"),
+    ("Iceberg Lettuce, each", 1.79, "$1.79/each"),
+    ("Boneless Skinless Chicken Breast 2.5 lb", 9.98, "$3.99/lb"),
+]
+
+# Sponsored listings: shown above the real results of any search they share a word with
+FIXTURE_DECOYS: List[Tuple[str, float, str]] = [
+    ("Banana Chips 6 oz", 2.49, "$0.42/oz"),
+    ("Apple Juice 64 fl oz", 3.29, "$0.05/oz"),
+    ("Chocolate Milk 1 gallon", 4.59, "$4.59/gal"),
+    ("Egg Noodles 12 oz", 1.99, "$0.17/oz"),
+    ("Butter Crackers 13.7 oz", 3.99, "$0.29/oz"),
+    ("Frozen Chicken Nuggets 2 lb", 8.99, "$4.50/lb"),
+    ("Coffee Creamer 32 oz", 4.29, "$0.13/oz"),
+    ("Cheese Crackers 12 oz", 3.79, "$0.32/oz"),
+]
+DECOY_NUMBERS = 100
+
+STORE_PRICE_FACTORS = {"target": 1.00, "walmart": 0.94, "safeway": 1.12, "qfc": 1.05, "fredmeyer": 1.02}
+STORE_BRANDS = {"target": "Good & Gather", "walmart": "Great Value", "safeway": "Signature",
+                "qfc": "Kroger", "fredmeyer": "Kroger"}
+
+
+def target_card(name: str, price: str, unit_price: str, href: str) -> str:
+    return (f'<div data-test="@web/ProductCard/Container"><a href="{href}"><h3>{name}</h3></a>'
+            f'<span data-test="current-price">{price}</span><span data-test="unit-price">{unit_price}</span></div>')
+
+
+def walmart_card(name: str, price: str, unit_price: str, href: str) -> str:
+    return (f'<div data-item-id="{href.rsplit("-", 1)[-1]}"><a href="{href}" aria-label="{name}">{name}</a>'
+            f'<div data-automation-id="product-price">{price}</div><div data-automation-id="unit-price">{unit_price}</div></div>')
+
+
+def safeway_card(name: str, price: str, unit_price: str, href: str) -> str:
+    return (f'<div data-auto-id="product-card"><a href="{href}"><span data-auto-id="product-title">{name}</span></a>'
+            f'<span data-auto-id="regular-price">{price}</span><span data-auto-id="uom-price">({unit_price})</span></div>')
+
+
+def kroger_card(name: str, price: str, unit_price: str, href: str) -> str:
+    return (f'<div data-qa="product-card"><a href="{href}"><span data-qa="product-name">{name}</span></a>'
+            f'<div data-qa="pricing"><mark data-qa="item-price">{price}</mark></div><span data-qa="unit-price">{unit_price}</span></div>')
+
+
+CARD_BUILDERS = {"target": target_card, "walmart": walmart_card, "safeway": safeway_card,
+                 "qfc": kroger_card, "fredmeyer": kroger_card}
+
+# Page weight the scrapers never need; names match the blocklist in grocery_price_compare.py
+STATIC_ASSETS = {
+    "hero.jpg": ("image/jpeg", b"\xff\xd8\xff\xe0" + b"\0" * 200_000),
+    "brand.woff2": ("font/woff2", b"wOF2" + b"\0" * 50_000),
+    "googletagmanager.js": ("application/javascript", b"window.dataLayer = [];"),
+    "doubleclick.js": ("application/javascript", b"window.ads = [];"),
+}
+STATIC_DELAY_S = 0.5
+
+
+def page_assets() -> str:
+    return ('<link rel="preload" href="/static/brand.woff2" as="font" type="font/woff2" crossorigin>'
+            '<style>@font-face { font-family: Brand; src: url(/static/brand.woff2); } body { font-family: Brand; }</style>'
+            '<script async src="/static/googletagmanager.js"></script><script async src="/static/doubleclick.js"></script>'
+            '<img src="/static/hero.jpg" alt="">')
+
+
+def words(text: str) -> set:
+    return {word.rstrip("s") for word in re.findall(r"[a-z]+", text.lower())}
+
+
+def search_results(query: str) -> List[Tuple[int, Tuple[str, float, str]]]:
+    """Catalog order, with products sharing a word with the query moved up and related sponsored listings on top."""
+    query_words = words(query)
+    products = list(enumerate(FIXTURE_PRODUCTS))
+    if not query_words:
+        return products
+    sponsored = [(DECOY_NUMBERS + number, decoy) for number, decoy in enumerate(FIXTURE_DECOYS) if words(decoy[0]) & query_words]
+    relevant = sorted(products, key=lambda product: -len(words(product[1][0]) & query_words))
+    return sponsored + relevant
+
+
+def store_products(store: str, query: str = "") -> Iterator[Tuple[str, float, float, str, str]]:
+    """(name, price, unit price, unit, product path) for every fixture product at a store, in search order."""
+    factor = STORE_PRICE_FACTORS[store]
+    for number, (name, price, unit_price) in search_results(query):
+        unit_value, unit = unit_price.lstrip("$").split("/")
+        yield (f"{STORE_BRANDS[store]} {name}", round(price * factor, 2), round(float(unit_value) * factor, 2), unit,
+               f"/p/{store}-{number}")
+
+
+def search_page(store: str, query: str = "", render_ms: int = 200) -> str:
+    cards = [CARD_BUILDERS[store](html.escape(name), f"${price:.2f}", f"${unit_price:.2f}/{unit}", href)
+             for name, price, unit_price, unit, href in store_products(store, query)]
+    # Cards are attached by script after render_ms, so a scraper has to wait for them
+    render = ('<template id="results">' + "".join(cards) + '</template><div id="grid"></div>'
+              '<script>setTimeout(function () { var grid = document.getElementById("grid");'
+              f' grid.appendChild(document.getElementById("results").content.cloneNode(true)); }}, {render_ms});</script>')
+    # Walmart also embeds its results as JSON, which store_api.py reads without rendering the page
+    data = ""
+    if store == "walmart":
+        data = ('<script id="__NEXT_DATA__" type="application/json">'
+                + json.dumps(walmart_search_data(query)).replace("</", "<\\/") + "</script>")
+    return (f"<!doctype html><html><head><title>{store} search</title>{page_assets()}</head>"
+            f"<body>{render}{data}</body></html>")
+
+
+# Recorded API responses, trimmed to the fields store_api.py reads
+
+def target_search_data(query: str = "") -> Dict:
+    return {"data": {"search": {"products": [
+        {"tcin": href.rsplit("-", 1)[-1],
+         "item": {"product_description": {"title": name}, "enrichment": {"buy_url": href}},
+         "price": {"current_retail": price, "formatted_current_price": f"${price:.2f}",
+                   "formatted_unit_price": f"${unit_price:.2f}", "formatted_unit_price_suffix": f"/{unit}"}}
+        for name, price, unit_price, unit, href in store_products("target", query)
+    ]}}}
+
+
+def walmart_search_data(query: str = "") -> Dict:
+    return {"props": {"pageProps": {"initialData": {"searchResult": {"itemStacks": [{"items": [
+        {"__typename": "Product", "name": name, "canonicalUrl": href, "price": price,
+         "priceInfo": {"linePrice": f"${price:.2f}", "unitPrice": f"${unit_price:.2f}/{unit}"}}
+        for name, price, unit_price, unit, href in store_products("walmart", query)
+    ]}]}}}}}
+
+
+def safeway_search_data(query: str = "") -> Dict:
+    docs = [{"pid": href.rsplit("-", 1)[-1], "name": name, "price": price, "basePrice": price,
+             "pricePer": unit_price, "unitOfMeasure": unit.upper()}
+            for name, price, unit_price, unit, href in store_products("safeway", query)]
+    return {"response": {"numFound": len(docs), "start": 0, "docs": docs}}
+
+
+def kroger_search_data(store: str, query: str = "") -> Dict:
+    return {"data": [
+        {"productId": href.rsplit("-", 1)[-1].zfill(13), "brand": STORE_BRANDS[store], "description": name,
+         "items": [{"price": {"regular": price, "promo": 0}, "size": ""}]}
+        for name, price, unit_price, unit, href in store_products(store, query)
+    ], "meta": {"pagination": {"start": 0, "limit": 10}}}
+
+
+API_BUILDERS = {"target": target_search_data, "safeway": safeway_search_data,
+                "qfc": functools.partial(kroger_search_data, "qfc"),
+                "fredmeyer": functools.partial(kroger_search_data, "fredmeyer")}
+
+
+# Search text parameter of every store page and API
+QUERY_PARAMS = ("searchTerm", "q", "query", "keyword", "filter.term")
+
+
+def fixture_urls(root: str) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """Site base URLs and API URLs ({store: url}) for fixtures served at root."""
+    base_urls = {store: f"{root}/{store}" for store in CARD_BUILDERS}
+    api_urls = {store: f"{root}/api/{store}" for store in API_BUILDERS}
+    api_urls["walmart"] = f"{root}/walmart/search"
+    return base_urls, api_urls
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    delay_s = 0.0
+    render_ms = 200
+    api_status = 200
+    static_hits: collections.Counter = collections.Counter()
+
+    def do_GET(self):
+        path, _, query_string = self.path.partition("?")
+        parts = path.strip("/").split("/")
+        params = urllib.parse.parse_qs(query_string)
+        query = next((params[key][0] for key in QUERY_PARAMS if key in params), "")
+        if parts[0] == "static" and len(parts) == 2 and parts[1] in STATIC_ASSETS:
+            self.static_hits[parts[1]] += 1
+            time.sleep(STATIC_DELAY_S)
+            content_type, body = STATIC_ASSETS[parts[1]]
+        elif parts[0] == "api" and len(parts) == 2 and parts[1] in API_BUILDERS:
+            time.sleep(self.delay_s)
+            if self.api_status != 200:
+                self.send_error(self.api_status)
+                return
+            content_type, body = "application/json", json.dumps(API_BUILDERS[parts[1]](query=query)).encode()
+        elif parts[0] in CARD_BUILDERS:
+            time.sleep(self.delay_s)
+            content_type, body = "text/html; charset=utf-8", search_page(parts[0], query, self.render_ms).encode()
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def serve_fixtures(port: int = 0, delay_s: float = 0.0, render_ms: int = 200, api_status: int = 200) -> Iterator[str]:
+    """Serve the fixture pages and API responses on a background thread; yields the root URL."""
+    handler = type("Handler", (FixtureHandler,), {"delay_s": delay_s, "render_ms": render_ms, "api_status": api_status})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Serve fixture store search pages locally.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds to wait before answering each request")
+    parser.add_argument("--render-ms", type=int, default=200, help="Milliseconds before the result cards are rendered")
+    parser.add_argument("--api-status", type=int, default=200, help="HTTP status of every /api response (e.g. 503 to test the fallback)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    with serve_fixtures(args.port, args.delay, args.render_ms, args.api_status) as root:
+        base_urls, api_urls = fixture_urls(root)
+        print("Serving fixtures:")
+        for store, url in base_urls.items():
+            print(f"  {store}: {url} (API {api_urls[store]})")
+        with contextlib.suppress(KeyboardInterrupt):
+            threading.Event().wait()
+    print(f"Static requests served: {dict(FixtureHandler.static_hits) or 'none'}")
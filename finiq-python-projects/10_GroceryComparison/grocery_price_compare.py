@@ -4,13 +4,14 @@ Grocery Price Comparator — Playwright (Python)
 What it does
 ------------
 - Looks up ~20 everyday grocery items across QFC, Safeway, Fred Meyer, Target, and Walmart.
-- Extracts the first relevant product from each store's search results.
+- Reads the top results of each store's search and keeps the product that best matches the item
+  (fuzzy-matched with rapidfuzz, preferring PREFER_BRANDS).
 - Normalizes prices to the same unit (e.g., $/lb, $/oz, $/count, $/gal) and compares stores.
 - Produces a tidy CSV and console table highlighting the cheapest store per item.
 
 ⚠️ Notes & caveats
 ------------------
-- Grocery sites change often and may block bots. This script uses Playwright to act like a browser, but you may still need to tweak selectors or add waits.
+- Grocery sites change often and may block bots. This script uses Playwright to act like a browser, but you may still need to tweak selectors.
 - Prices are location-specific. Configure ZIP/store preferences below.
 - This is for personal, educational use. Respect each website's Terms of Use.
 
@@ -18,33 +19,60 @@ Setup
 -----
 1) Python 3.10+
 2) Install deps:
-   pip install playwright pandas python-dateutil rapidfuzz
+   pip install playwright pandas python-dateutil rapidfuzz httpx
    playwright install chromium
 3) Run:
    python grocery_price_compare.py
+   python grocery_price_compare.py --fixtures          # against local fixture pages (fixture_server.py)
+
+Every (item, store) search runs concurrently over a pool of MAX_CONCURRENCY pages, with at most
+STORE_CONCURRENCY searches in flight per store, a timeout per search and retries with backoff.
+Pages are read as soon as their result cards appear, and images, fonts, ads and trackers are never loaded.
+Stores with a JSON search API (see store_api.py) are asked over a pooled HTTP client first, and only
+searches the API can't answer fall back to the browser, which isn't started at all if none do.
+Large catalogs: --items takes a CSV/YAML item catalog and --locations a list of ZIPs (see catalog.py).
+The work is split into partitions of --partition-items items per location, run in --workers processes
+that each own a browser. Results are appended to --output (CSV, or JSON Lines for .jsonl) every STREAM_BATCH
+finished searches instead of being held until the end, and --resume skips the (item, store) pairs already
+in that file; the cheapest-store summary is then built from the file in chunks (see result_stream.py).
+Results are cached in SQLite per (store, ZIP, query) for --ttl hours (see price_cache.py), so a rerun only
+scrapes stale entries; --refresh re-scrapes everything and --history exports the prices seen across runs.
 
 Output
 ------
-- ./grocery_prices.csv  — all raw rows found
-- ./grocery_cheapest.csv — normalized, one row per item with the cheapest store
+- ./grocery_prices.csv  — all raw rows found, appended as searches finish (--output); a search that
+  found nothing gets a row with no name or price, so --resume doesn't repeat it
+- ./grocery_cheapest.csv — normalized, one row per item and ZIP with the cheapest store
+- ./grocery_cache.sqlite — cached results and price history
 """
 
 from __future__ import annotations
 
+import argparse
 import asyncio
 import contextlib
 import csv
-import math
+import functools
+import multiprocessing
+import os
+import random
 import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 import pandas as pd
-from rapidfuzz import process, fuzz
 from dateutil import parser as dateparser
 
 from playwright.async_api import async_playwright
 
+from catalog import load_items, load_locations
+from matching import best_matches
+from normalization import normalize_frame
+from price_cache import DEFAULT_CACHE_PATH, DEFAULT_TTL_S, PriceCache
+from result_stream import CHUNK_ROWS, ResultSink, read_done, read_results, set_lock
+from store_api import API_ADAPTERS, STORE_API_URLS, open_client, search_api
+
 # =========================
 # Configuration
 # =========================
@@ -53,6 +81,8 @@ from playwright.async_api import async_playwright
 ZIP_CODE = "98109"  # Seattle default — change to your ZIP
 CITY = "Seattle"
 STATE = "WA"
+LATITUDE, LONGITUDE = 47.620, -122.339
+DEFAULT_LOCATION = {"zip": ZIP_CODE, "city": CITY, "state": STATE, "latitude": LATITUDE, "longitude": LONGITUDE}
 
 # Which stores to scrape (toggle True/False)
 ENABLED_STORES = {
@@ -63,6 +93,46 @@ ENABLED_STORES = {
     "walmart": True,
 }
 
+# Where each store's search pages live (overridden with --fixtures to use local copies)
+STORE_BASE_URLS = {
+    "qfc": "https://www.qfc.com",
+    "safeway": "https://www.safeway.com",
+    "fredmeyer": "https://www.fredmeyer.com",
+    "target": "https://www.target.com",
+    "walmart": "https://www.walmart.com",
+}
+
+# Store key -> the store name written in the results
+STORE_LABELS = {"qfc": "QFC", "safeway": "Safeway", "fredmeyer": "Fred Meyer", "target": "Target", "walmart": "Walmart"}
+
+# Large catalogs: items per partition handed to a worker process (each with its own browser)
+PARTITION_ITEMS = 100
+# Finished searches matched and appended to the output together
+STREAM_BATCH = 25
+
+# Concurrency (per worker): pages open at once, searches in flight per store, and per-search timeout/retries
+MAX_CONCURRENCY = 8
+STORE_CONCURRENCY = {"qfc": 2, "safeway": 2, "fredmeyer": 2, "target": 2, "walmart": 2}
+TASK_TIMEOUT_S = 45
+RETRIES = 2
+BACKOFF_S = 2.0
+
+# Results read per search and scored against the query to pick the product (see matching.py)
+TOP_K = 10
+
+# Page readiness: wait for the result cards up to this ceiling instead of sleeping a fixed time
+READY_TIMEOUT_MS = 10_000
+IDLE_GRACE_MS = 500
+
+# Requests aborted before they load: only the HTML/JS/XHR that renders the results is needed
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+BLOCKED_URL_RE = re.compile(
+    r"doubleclick|googlesyndication|googletagmanager|google-analytics|googleadservices|adservice|adsystem|"
+    r"amazon-adsystem|criteo|taboola|outbrain|facebook\.net|connect\.facebook|hotjar|scorecardresearch|"
+    r"quantserve|newrelic|nr-data|optimizely|segment\.(?:io|com)|bat\.bing|tiktok|pinterest|clarity\.ms",
+    re.IGNORECASE,
+)
+
 # Top ~20 everyday items to compare. Each item defines a target normalization unit.
 # normalize_to choices: "per_lb", "per_oz", "per_count", "per_gal", "per_l".
 ITEMS: List[Dict] = [
@@ -98,122 +168,6 @@ PREFER_BRANDS = [
     "Great Value", "Market Pantry", "Good & Gather",
 ]
 
-# =========================
-# Helpers — units & parsing
-# =========================
-
-UNIT_ALIASES = {
-    "lb": ["lb", "lbs", "pound", "pounds"],
-    "oz": ["oz", "ounce", "ounces"],
-    "gal": ["gal", "gallon", "gallons"],
-    "l": ["l", "liter", "liters", "litre", "litres"],
-    "count": ["ct", "count", "ea", "each"],
-}
-
-OZ_PER_LB = 16.0
-OZ_PER_GAL = 128.0
-L_PER_GAL = 3.78541
-
-
-def identify_unit(text: str) -> Optional[str]:
-    t = text.lower()
-    for canon, aliases in UNIT_ALIASES.items():
-        for a in aliases:
-            if re.search(rf"(?<![a-z]){re.escape(a)}(?![a-z])", t):
-                return canon
-    # common package hints
-    if re.search(r"\bdoz|dozen\b", t):
-        return "count"
-    return None
-
-
-def extract_size(text: str) -> Tuple[Optional[float], Optional[str]]:
-    """Extract package size like '32 oz', '1 lb', '5 lb', '1 gal', '2 ct'."""
-    t = text.lower()
-    # patterns like '32 oz', '1 lb', '12 fl oz', '5 lb', '2 ct'
-    m = re.search(r"([0-9]*\.?[0-9]+)\s*(fl\s*)?(oz|ounce|ounces|lb|lbs|pound|pounds|gal|gallon|gallons|l|liter|litre|liters|litres|ct|count|ea|each)\b",
-                  t)
-    if m:
-        qty = float(m.group(1))
-        unit = m.group(3)
-        # normalize unit alias
-        unit_id = identify_unit(unit) or unit
-        return qty, unit_id
-    # catch 'dozen'
-    if "dozen" in t:
-        return 12.0, "count"
-    return None, None
-
-
-def normalize_price(price_total: float, name: str, unit_price_text: Optional[str], target: str) -> Optional[float]:
-    """Return normalized price per target unit using either unit_price_text (preferred) or derived from package size."""
-    # Try unit price text first, e.g., "$0.25/oz" or "$1.49/lb"
-    if unit_price_text:
-        m = re.search(r"\$\s*([0-9]*\.?[0-9]+)\s*/\s*([a-zA-Z]+)", unit_price_text)
-        if m:
-            val = float(m.group(1))
-            unit = identify_unit(m.group(2) or "")
-            if unit:
-                return convert_unit_price(val, unit, target)
-
-    # Else derive from size in product title
-    qty, unit = extract_size(name)
-    if qty and unit:
-        unit_price = price_total / qty
-        return convert_unit_price(unit_price, unit, target)
-
-    return None
-
-
-def convert_unit_price(value: float, src_unit: str, target_unit: str) -> Optional[float]:
-    src = src_unit
-    tgt = target_unit
-    if src == tgt:
-        return value
-
-    # Weight conversions (oz <-> lb)
-    if src == "oz" and tgt == "per_lb":
-        return value * OZ_PER_LB
-    if src == "lb" and tgt == "per_oz":
-        return value / OZ_PER_LB
-
-    # Volume conversions (oz <-> gal, l <-> gal)
-    if src == "oz" and tgt == "per_gal":
-        return value * OZ_PER_GAL
-    if src == "gal" and tgt == "per_oz":
-        return value / OZ_PER_GAL
-    if src == "l" and tgt == "per_gal":
-        return value * L_PER_GAL
-    if src == "gal" and tgt == "per_l":
-        return value / L_PER_GAL
-
-    # Map canonical naming for targets
-    # Convert targets like "per_lb" -> canonical unit strings
-    target_map = {
-        "per_lb": "lb",
-        "per_oz": "oz",
-        "per_gal": "gal",
-        "per_l": "l",
-        "per_count": "count",
-    }
-    tgt_canon = target_map.get(tgt, tgt)
-
-    # Simple same-dimension conversions
-    if src == "count" and tgt_canon == "count":
-        return value
-    if src == "lb" and tgt_canon == "lb":
-        return value
-    if src == "oz" and tgt_canon == "oz":
-        return value
-    if src == "gal" and tgt_canon == "gal":
-        return value
-    if src == "l" and tgt_canon == "l":
-        return value
-
-    # Fallback: unsupported conversion
-    return None
-
-
 # =========================
 # Scraper implementations
 # =========================
@@ -228,78 +182,116 @@ class ProductHit:
     normalized_price: Optional[float]
     normalized_to: str
     url: str
+    match_score: Optional[float] = None
 
 
-async def search_target(page, query: str) -> Optional[ProductHit]:
-    # Target web search (RedSky API exists but can rate limit; use web page)
-    url = f"https://www.target.com/s?searchTerm={query.replace(' ', '+')}"
-    await page.goto(url, wait_until="domcontentloaded")
-    await page.wait_for_timeout(1500)
+# Reads the given fields of the first `limit` cards in one round trip; fields: {key: [selector, attribute or null]}
+CARD_FIELDS_JS = """
+(cards, [fields, limit]) => cards.slice(0, limit).map(card => Object.fromEntries(
+    Object.entries(fields).map(([key, [selector, attribute]]) => {
+        const node = card.querySelector(selector);
+        return [key, node ? (attribute ? node.getAttribute(attribute) : node.textContent) : null];
+    })))
+"""
 
-    # First tile
-    with contextlib.suppress(Exception):
-        # Try to click location dismiss if appears
-        mod_close = page.locator('button:has-text("Not now")')
-        if await mod_close.count():
-            await mod_close.first.click()
 
-    product_card = page.locator('[data-test="@web/ProductCard/Container"]').first
-    if not await product_card.count():
-        return None
+async def read_cards(page, selector: str, fields: Dict[str, Tuple[str, Optional[str]]], limit: int) -> List[Dict]:
+    """Text (or attribute) of each field in the first limit result cards; None for fields a card lacks."""
+    return await page.locator(selector).evaluate_all(CARD_FIELDS_JS, [fields, limit])
 
-    name = await product_card.locator('a h3, a[data-test="product-title"]').first.text_content()
-    price_text = await product_card.locator('[data-test="current-price"]').first.text_content()
-    unit_price_text = await product_card.locator('[data-test="unit-price"]').first.text_content().catch(lambda _: None)
-
-    price_total = parse_price(price_text)
-    href = await product_card.locator('a').first.get_attribute('href')
-    prod_url = f"https://www.target.com{href}" if href and href.startswith('/') else (href or url)
 
+def card_hit(store: str, query: str, card: Dict, base: str, page_url: str) -> ProductHit:
+    href = card.get("href")
     return ProductHit(
-        store="Target",
+        store=store,
         query=query,
-        name=(name or "").strip(),
-        price_total=price_total,
-        unit_price_text=(unit_price_text or "").strip() if unit_price_text else None,
+        name=(card.get("name") or "").strip(),
+        price_total=parse_price(card.get("price")),
+        unit_price_text=(card.get("unit_price") or "").strip() or None,
         normalized_price=None,
         normalized_to="",
-        url=prod_url,
+        url=f"{base}{href}" if href and href.startswith('/') else (href or page_url),
     )
 
 
-async def search_walmart(page, query: str) -> Optional[ProductHit]:
-    url = f"https://www.walmart.com/search?q={query.replace(' ', '+')}"
+async def wait_for_results(page, selector: str, timeout_ms: int = READY_TIMEOUT_MS) -> bool:
+    """
+    Wait until a result card is attached instead of sleeping a fixed time.
+
+    Returns as soon as the selector matches. If the network goes idle first (e.g. a "no results" page),
+    the selector gets one short grace period; timeout_ms is the overall ceiling.
+    """
+    card = asyncio.ensure_future(page.wait_for_selector(selector, state="attached", timeout=timeout_ms))
+    idle = asyncio.ensure_future(page.wait_for_load_state("networkidle", timeout=timeout_ms))
+    try:
+        done, _ = await asyncio.wait({card, idle}, return_when=asyncio.FIRST_COMPLETED)
+        if card in done:
+            return card.exception() is None
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(asyncio.shield(card), IDLE_GRACE_MS / 1000)
+            return True
+        return False
+    finally:
+        for task in (card, idle):
+            task.cancel()
+            with contextlib.suppress(BaseException):
+                await task
+
+
+async def block_heavy_requests(route) -> None:
+    """Route handler: drop images, media, fonts, ads and trackers; let everything else through."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_URL_RE.search(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+TARGET_CARD = '[data-test="@web/ProductCard/Container"]'
+TARGET_FIELDS = {"name": ('a h3, a[data-test="product-title"]', None), "price": ('[data-test="current-price"]', None),
+                 "unit_price": ('[data-test="unit-price"]', None), "href": ('a', 'href')}
+
+
+async def search_target(page, query: str, base: str = "https://www.target.com", limit: int = TOP_K) -> List[ProductHit]:
+    # Target web search (the RedSky API is tried first, see store_api.py)
+    url = f"{base}/s?searchTerm={query.replace(' ', '+')}"
     await page.goto(url, wait_until="domcontentloaded")
-    await page.wait_for_timeout(1500)
+    await wait_for_results(page, TARGET_CARD)
 
-    product = page.locator('[data-item-id]').first
-    if not await product.count():
-        return None
+    with contextlib.suppress(Exception):
+        # Try to click location dismiss if appears
+        mod_close = page.locator('button:has-text("Not now")')
+        if await mod_close.count():
+            await mod_close.first.click()
 
-    name = await product.locator('a[aria-label]').first.get_attribute('aria-label')
-    price_text = await product.locator('[data-automation-id="product-price"]').first.text_content()
-    unit_price_text = await product.locator('[data-automation-id="unit-price"]').first.text_content().catch(lambda _: None)
+    cards = await read_cards(page, TARGET_CARD, TARGET_FIELDS, limit)
+    return [card_hit("Target", query, card, base, url) for card in cards]
 
-    href = await product.locator('a').first.get_attribute('href')
-    prod_url = f"https://www.walmart.com{href}" if href and href.startswith('/') else (href or url)
 
-    return ProductHit(
-        store="Walmart",
-        query=query,
-        name=(name or "").strip(),
-        price_total=parse_price(price_text),
-        unit_price_text=(unit_price_text or "").strip() if unit_price_text else None,
-        normalized_price=None,
-        normalized_to="",
-        url=prod_url,
-    )
+WALMART_CARD = '[data-item-id]'
+WALMART_FIELDS = {"name": ('a[aria-label]', 'aria-label'), "price": ('[data-automation-id="product-price"]', None),
+                  "unit_price": ('[data-automation-id="unit-price"]', None), "href": ('a', 'href')}
+
+
+async def search_walmart(page, query: str, base: str = "https://www.walmart.com", limit: int = TOP_K) -> List[ProductHit]:
+    url = f"{base}/search?q={query.replace(' ', '+')}"
+    await page.goto(url, wait_until="domcontentloaded")
+    await wait_for_results(page, WALMART_CARD)
+
+    cards = await read_cards(page, WALMART_CARD, WALMART_FIELDS, limit)
+    return [card_hit("Walmart", query, card, base, url) for card in cards]
+
 
+SAFEWAY_CARD = '[data-auto-id="product-card"]'
+SAFEWAY_FIELDS = {"name": ('[data-auto-id="product-title"]', None), "price": ('[data-auto-id="regular-price"]', None),
+                  "unit_price": ('[data-auto-id="uom-price"]', None), "href": ('a', 'href')}
 
-async def search_safeway(page, query: str) -> Optional[ProductHit]:
+
+async def search_safeway(page, query: str, base: str = "https://www.safeway.com", limit: int = TOP_K) -> List[ProductHit]:
     # Safeway (Albertsons) — location modal appears; try to set ZIP via store selector
-    search_url = f"https://www.safeway.com/shop/search-results.html?q={query.replace(' ', '+')}"
+    search_url = f"{base}/shop/search-results.html?q={query.replace(' ', '+')}"
     await page.goto(search_url, wait_until="domcontentloaded")
-    await page.wait_for_timeout(2000)
+    await wait_for_results(page, SAFEWAY_CARD)
 
     # Dismiss cookie/zip modals when present
     with contextlib.suppress(Exception):
@@ -312,35 +304,23 @@ async def search_safeway(page, query: str) -> Optional[ProductHit]:
         if await cont.count():
             await cont.first.click()
 
-    card = page.locator('[data-auto-id="product-card"]').first
-    if not await card.count():
-        return None
+    cards = await read_cards(page, SAFEWAY_CARD, SAFEWAY_FIELDS, limit)
+    return [card_hit("Safeway", query, card, base, search_url) for card in cards]
 
-    name = await card.locator('[data-auto-id="product-title"]').first.text_content()
-    price_text = await card.locator('[data-auto-id="regular-price"]').first.text_content()
-    unit_price_text = await card.locator('[data-auto-id="uom-price"]').first.text_content().catch(lambda _: None)
 
-    href = await card.locator('a').first.get_attribute('href')
-    prod_url = f"https://www.safeway.com{href}" if href and href.startswith('/') else (href or search_url)
+# Current product cards, or the older ProductCard layout
+KROGER_CARD = '[data-qa="product-card"], div[class*="ProductCard"]'
+KROGER_FIELDS = {"name": ('[data-qa="product-name"]', None), "price": ('[data-qa="pricing"] [data-qa="item-price"]', None),
+                 "unit_price": ('[data-qa="unit-price"]', None), "href": ('a', 'href')}
 
-    return ProductHit(
-        store="Safeway",
-        query=query,
-        name=(name or "").strip(),
-        price_total=parse_price(price_text),
-        unit_price_text=(unit_price_text or "").strip() if unit_price_text else None,
-        normalized_price=None,
-        normalized_to="",
-        url=prod_url,
-    )
 
-
-async def search_kroger_banner(page, query: str, banner: str) -> Optional[ProductHit]:
+async def search_kroger_banner(page, query: str, banner: str, base: Optional[str] = None,
+                               limit: int = TOP_K) -> List[ProductHit]:
     # banner in {"qfc", "fredmeyer"}
-    base = "https://www.qfc.com" if banner == "qfc" else "https://www.fredmeyer.com"
+    base = base or ("https://www.qfc.com" if banner == "qfc" else "https://www.fredmeyer.com")
     url = f"{base}/search?query={query.replace(' ', '+')}"
     await page.goto(url, wait_until="domcontentloaded")
-    await page.wait_for_timeout(2000)
+    await wait_for_results(page, KROGER_CARD)
 
     # cookie & location modals
     with contextlib.suppress(Exception):
@@ -352,31 +332,9 @@ async def search_kroger_banner(page, query: str, banner: str) -> Optional[Produc
         if await close.count():
             await close.first.click()
 
-    product = page.locator('[data-qa="product-card"]').first
-    if not await product.count():
-        # alternate selector
-        product = page.locator('div[class*="ProductCard"]').first
-        if not await product.count():
-            return None
-
-    name = await product.locator('[data-qa="product-name"]').first.text_content()
-    price_text = await product.locator('[data-qa="pricing"] [data-qa="item-price"]').first.text_content()
-    unit_price_text = await product.locator('[data-qa="unit-price"]').first.text_content().catch(lambda _: None)
-
-    href = await product.locator('a').first.get_attribute('href')
-    prod_url = f"{base}{href}" if href and href.startswith('/') else (href or url)
-
     store_label = "QFC" if banner == "qfc" else "Fred Meyer"
-    return ProductHit(
-        store=store_label,
-        query=query,
-        name=(name or "").strip(),
-        price_total=parse_price(price_text),
-        unit_price_text=(unit_price_text or "").strip() if unit_price_text else None,
-        normalized_price=None,
-        normalized_to="",
-        url=prod_url,
-    )
+    cards = await read_cards(page, KROGER_CARD, KROGER_FIELDS, limit)
+    return [card_hit(store_label, query, card, base, url) for card in cards]
 
 
 PRICE_RE = re.compile(r"\$\s*([0-9]*\.?[0-9]+)")
@@ -389,122 +347,408 @@ def parse_price(text: Optional[str]) -> Optional[float]:
     return float(m.group(1)) if m else None
 
 
+# Store key -> search function(page, query, base, limit) returning the top results in the store's order
+STORE_SEARCHES = {
+    "target": search_target,
+    "walmart": search_walmart,
+    "safeway": search_safeway,
+    "qfc": functools.partial(search_kroger_banner, banner="qfc"),
+    "fredmeyer": functools.partial(search_kroger_banner, banner="fredmeyer"),
+}
+
+
 # =========================
 # Orchestration
 # =========================
 
-async def fetch_all() -> pd.DataFrame:
-    rows: List[Dict] = []
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context(
-            locale="en-US",
-            geolocation={"longitude": -122.339, "latitude": 47.620},
-            permissions=["geolocation"],
-        )
-        page = await context.new_page()
-
-        for item in ITEMS:
-            query = item["name"]
-
-            if ENABLED_STORES.get("target"):
-                with contextlib.suppress(Exception):
-                    hit = await search_target(page, query)
-                    if hit:
-                        hit.normalized_to = item["normalize_to"]
-                        hit.normalized_price = normalize_price(hit.price_total or math.nan, hit.name, hit.unit_price_text, item["normalize_to"]) if hit.price_total else None
-                        rows.append(hit.__dict__)
-
-            if ENABLED_STORES.get("walmart"):
+class PagePool:
+    """
+    A fixed set of open pages shared by all tasks; a page that failed is swapped for a fresh one.
+
+    The browser context is only opened (by open_context) when the first page is asked for, so a run
+    where every search is answered by a store API never starts Chromium.
+    """
+
+    def __init__(self, open_context, size: int):
+        self.open_context = open_context
+        self.size = size
+        self.context = None
+        self.pages: asyncio.Queue = asyncio.Queue()
+        self.lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        async with self.lock:
+            if self.context is None:
+                self.context = await self.open_context()
+                for _ in range(self.size):
+                    self.pages.put_nowait(await self.context.new_page())
+
+    async def close(self) -> None:
+        if self.context is not None:
+            await self.context.close()
+
+    @contextlib.asynccontextmanager
+    async def page(self):
+        await self.start()
+        page = await self.pages.get()
+        healthy = False
+        try:
+            yield page
+            healthy = True
+        finally:
+            if not healthy:
                 with contextlib.suppress(Exception):
-                    hit = await search_walmart(page, query)
-                    if hit:
-                        hit.normalized_to = item["normalize_to"]
-                        hit.normalized_price = normalize_price(hit.price_total or math.nan, hit.name, hit.unit_price_text, item["normalize_to"]) if hit.price_total else None
-                        rows.append(hit.__dict__)
-
-            if ENABLED_STORES.get("safeway"):
-                with contextlib.suppress(Exception):
-                    hit = await search_safeway(page, query)
-                    if hit:
-                        hit.normalized_to = item["normalize_to"]
-                        hit.normalized_price = normalize_price(hit.price_total or math.nan, hit.name, hit.unit_price_text, item["normalize_to"]) if hit.price_total else None
-                        rows.append(hit.__dict__)
-
-            if ENABLED_STORES.get("qfc"):
-                with contextlib.suppress(Exception):
-                    hit = await search_kroger_banner(page, query, banner="qfc")
-                    if hit:
-                        hit.normalized_to = item["normalize_to"]
-                        hit.normalized_price = normalize_price(hit.price_total or math.nan, hit.name, hit.unit_price_text, item["normalize_to"]) if hit.price_total else None
-                        rows.append(hit.__dict__)
-
-            if ENABLED_STORES.get("fredmeyer"):
-                with contextlib.suppress(Exception):
-                    hit = await search_kroger_banner(page, query, banner="fredmeyer")
-                    if hit:
-                        hit.normalized_to = item["normalize_to"]
-                        hit.normalized_price = normalize_price(hit.price_total or math.nan, hit.name, hit.unit_price_text, item["normalize_to"]) if hit.price_total else None
-                        rows.append(hit.__dict__)
+                    await page.close()
+                page = await self.context.new_page()
+            self.pages.put_nowait(page)
+
+
+def finish_hit(hit: ProductHit, item: Dict) -> ProductHit:
+    # normalized_price is filled in by hits_frame, for the whole batch at once
+    hit.normalized_to = item["normalize_to"]
+    return hit
+
+
+async def run_task(pool: PagePool, semaphore: asyncio.Semaphore, store_limit: asyncio.Semaphore,
+                   store: str, item: Dict, base: str, timeout: float = TASK_TIMEOUT_S,
+                   retries: int = RETRIES, client=None, api_url: Optional[str] = None,
+                   limit: int = TOP_K) -> Optional[List[ProductHit]]:
+    """
+    One (item, store) search, returning the store's top results ([] if it found nothing, None if it
+    failed): the store's JSON API first when there is a client for it, then the Playwright scraper
+    with a timeout, retried with exponential backoff and jitter.
+    """
+    if client is not None and api_url:
+        try:
+            async with store_limit:
+                found = await asyncio.wait_for(search_api(client, store, item["name"], api_url, base, limit), timeout)
+            return [ProductHit(**fields) for fields in found]
+        except Exception:
+            pass  # blocked, changed or unreachable API: scrape the page instead
+
+    search = STORE_SEARCHES[store]
+    for attempt in range(retries + 1):
+        try:
+            async with store_limit, semaphore, pool.page() as page:
+                return await asyncio.wait_for(search(page, item["name"], base=base, limit=limit), timeout)
+        except Exception as exc:
+            if attempt == retries:
+                print(f"  {store}: '{item['name']}' failed after {attempt + 1} attempts ({type(exc).__name__})")
+                return None
+            await asyncio.sleep(BACKOFF_S * 2 ** attempt + random.uniform(0, BACKOFF_S))
+    return None
 
-        await context.close()
-        await browser.close()
 
-    return pd.DataFrame(rows)
+def choose_hits(searches: List[Tuple[Dict, str]], results: List[Optional[List[ProductHit]]]) -> List[Optional[ProductHit]]:
+    """The best match for each search among its results, all scored in one batch (see matching.py)."""
+    matches = best_matches([item["name"] for item, _ in searches],
+                           [[hit.name for hit in found or []] for found in results], PREFER_BRANDS)
+    chosen = []
+    for (item, _), found, (index, score) in zip(searches, results, matches):
+        hit = found[index] if index is not None else None
+        if hit:
+            hit.match_score = score
+            hit = finish_hit(hit, item)
+        chosen.append(hit)
+    return chosen
+
+
+async def fetch_all(items: List[Dict] = ITEMS, base_urls: Optional[Dict[str, str]] = None,
+                    concurrency: int = MAX_CONCURRENCY, timeout: float = TASK_TIMEOUT_S,
+                    retries: int = RETRIES, block_requests: bool = True,
+                    cache: Optional[PriceCache] = None, refresh: bool = False,
+                    use_api: bool = True, api_urls: Optional[Dict[str, str]] = None,
+                    location: Optional[Dict] = None, top_k: int = TOP_K,
+                    sink: Optional[ResultSink] = None, skip: Optional[Set[Tuple[str, str]]] = None) -> int:
+    """
+    Run every (item, store) search for one location concurrently, skipping fresh cached results and the
+    (store, query) pairs in skip. Stores with an API adapter are asked over one pooled HTTP client first;
+    the rest share a pool of browser pages. Each search brings back the top_k results, and the one matching
+    the item best is kept. Rows are appended to sink every STREAM_BATCH finished searches; returns how many
+    products were found.
+    """
+    stores = [store for store, enabled in ENABLED_STORES.items() if enabled]
+    base_urls = {**STORE_BASE_URLS, **(base_urls or {})}
+    api_urls = {**STORE_API_URLS, **(api_urls or {})}
+    location = location or DEFAULT_LOCATION
+    zip_code = location["zip"]
+    sink = sink or ResultSink(os.devnull)
+    searches = [(item, store) for item in items for store in stores if (store, item["name"]) not in (skip or ())]
+
+    cached = cache.fresh(zip_code) if cache and not refresh else {}
+    # Cached hits are normalized again (in bulk, in hits_frame), so changes to the unit handling apply to them too
+    hits = [ProductHit(**dict(cached[store, item["name"]], normalized_to=item["normalize_to"]))
+            if cached[store, item["name"]] else miss_hit(item, store)
+            for item, store in searches if (store, item["name"]) in cached]
+    pending = [(item, store) for item, store in searches if (store, item["name"]) not in cached]
+    if cached:
+        print(f"Cache: {len(searches) - len(pending)} fresh results, {len(pending)} searches to run")
+    df = hits_frame(hits, zip_code)
+    sink.write(df)
+    written = found_rows(df)
+    if not pending:
+        return written
+
+    def flush(batch: List[Tuple[int, Optional[List[ProductHit]]]]) -> None:
+        nonlocal written
+        done = [pending[index] for index, _ in batch]
+        results = [found for _, found in batch]
+        chosen = choose_hits(done, results)
+        # Searches that completed without a match are written too, so --resume skips them; failures aren't
+        df = hits_frame([hit or (miss_hit(item, store) if found is not None else None)
+                         for (item, store), found, hit in zip(done, results, chosen)], zip_code)
+        sink.write(df)
+        written += found_rows(df)
+        # Only completed searches are cached; a failure is retried on the next run
+        if cache:
+            for (item, store), found, hit in zip(done, results, chosen):
+                if found is not None:
+                    cache.put(store, zip_code, item["name"], hit.__dict__ if hit else None)
+
+    async def numbered(index: int, task) -> Tuple[int, Optional[List[ProductHit]]]:
+        return index, await task
+
+    async with contextlib.AsyncExitStack() as stack:
+        client = None
+        if use_api:
+            try:
+                client = await stack.enter_async_context(open_client(concurrency))
+            except ImportError:
+                print("httpx is not installed; scraping every store with the browser")
+
+        async def open_context():
+            playwright = await stack.enter_async_context(async_playwright())
+            browser = await playwright.chromium.launch(headless=True)
+            stack.push_async_callback(browser.close)
+            context = await browser.new_context(
+                locale="en-US",
+                geolocation={"longitude": location.get("longitude", LONGITUDE),
+                             "latitude": location.get("latitude", LATITUDE)},
+                permissions=["geolocation"],
+            )
+            if block_requests:
+                await context.route("**/*", block_heavy_requests)
+            return context
+
+        pool = PagePool(open_context, min(concurrency, len(pending)))
+        semaphore = asyncio.Semaphore(concurrency)
+        store_limits = {store: asyncio.Semaphore(STORE_CONCURRENCY.get(store, 2)) for store in stores}
+
+        tasks = [
+            numbered(index, run_task(pool, semaphore, store_limits[store], store, item, base_urls[store], timeout, retries,
+                                     client if store in API_ADAPTERS else None, api_urls.get(store), top_k))
+            for index, (item, store) in enumerate(pending)
+        ]
+        batch = []
+        for next_done in asyncio.as_completed(tasks):
+            batch.append(await next_done)
+            if len(batch) >= STREAM_BATCH:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        await pool.close()
+
+    return written
+
+
+def miss_hit(item: Dict, store: str) -> ProductHit:
+    """Placeholder row for a search that completed without finding the item."""
+    return ProductHit(STORE_LABELS[store], item["name"], None, None, None, None, item["normalize_to"], None)
+
+
+def found_rows(df: pd.DataFrame) -> int:
+    return int(df["name"].notna().sum()) if not df.empty else 0
+
+
+def hits_frame(hits: List[Optional[ProductHit]], zip_code: str) -> pd.DataFrame:
+    """One row per hit, normalized in bulk; the prices are set on the hits too, so the cache stores them."""
+    hits = [hit for hit in hits if hit]
+    df = pd.DataFrame([hit.__dict__ for hit in hits])
+    if not df.empty:
+        df.insert(0, "zip_code", zip_code)
+        df["normalized_price"] = normalize_frame(df)
+        for hit, price in zip(hits, df["normalized_price"].tolist()):
+            hit.normalized_price = price if pd.notna(price) else None
+    return df
+
+
+def fetch_partition(location: Dict, items: List[Dict], cache_path: Optional[str], ttl_s: float, output_path: str,
+                    skip: Set[Tuple[str, str]], options: Dict) -> int:
+    """One partition (a slice of the catalog at one location) in its own event loop, browser and cache connection."""
+    cache = PriceCache(cache_path, ttl_s) if cache_path else None
+    try:
+        return asyncio.run(fetch_all(items, location=location, cache=cache, sink=ResultSink(output_path), skip=skip, **options))
+    finally:
+        if cache:
+            cache.close()
+
+
+def fetch_catalog(items: List[Dict], locations: List[Dict], output_path: str, workers: int = 1,
+                  partition_items: int = PARTITION_ITEMS, cache_path: Optional[str] = None,
+                  ttl_s: float = DEFAULT_TTL_S, resume: bool = False, **options) -> int:
+    """
+    Search every item at every location, split into partitions of partition_items items. With workers > 1
+    the partitions run in separate processes, each with its own browser. Results are appended to output_path
+    as searches finish (and each result is in the cache), so a crash loses at most the batches in flight.
+    With resume, output_path is kept and the (item, store) pairs already in it aren't searched again.
+    Returns the number of products found.
+    """
+    partitions = [(location, items[start:start + partition_items])
+                  for location in locations for start in range(0, len(items), partition_items)]
+    skips: Dict[str, Set[Tuple[str, str]]] = {}
+    if resume:
+        store_keys = {label: store for store, label in STORE_LABELS.items()}
+        for zip_code, label, query in read_done(output_path):
+            skips.setdefault(zip_code, set()).add((store_keys.get(label, label), query))
+        print(f"Resuming: {sum(map(len, skips.values()))} results already in {output_path}")
+    elif os.path.exists(output_path):
+        os.remove(output_path)
+    written = 0
+
+    def save(number: int, location: Dict, partition: List[Dict], result) -> None:
+        nonlocal written
+        label = f"[{number}/{len(partitions)}] {location['zip']}: {len(partition)} items"
+        try:
+            rows = result()
+        except Exception as exc:
+            print(f"{label} failed ({type(exc).__name__}: {exc})")
+            return
+        written += rows
+        print(f"{label}, {rows} results")
+
+    def skip(location: Dict, partition: List[Dict]) -> Set[Tuple[str, str]]:
+        names = {item["name"] for item in partition}
+        return {(store, query) for store, query in skips.get(location["zip"], ()) if query in names}
+
+    if workers <= 1:
+        for number, (location, partition) in enumerate(partitions, start=1):
+            save(number, location, partition, functools.partial(fetch_partition, location, partition, cache_path, ttl_s,
+                                                                output_path, skip(location, partition), options))
+    else:
+        # Workers append to the same file, one batch at a time under a shared lock
+        with ProcessPoolExecutor(max_workers=workers, initializer=set_lock, initargs=(multiprocessing.Lock(),)) as executor:
+            futures = {executor.submit(fetch_partition, location, partition, cache_path, ttl_s, output_path,
+                                       skip(location, partition), options): (location, partition)
+                       for location, partition in partitions}
+            for number, future in enumerate(as_completed(futures), start=1):
+                save(number, *futures[future], future.result)
+
+    return written
+
+
+SUMMARY_KEYS = ["zip_code", "query", "normalized_to"]
 
 
 def pick_cheapest(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per (ZIP, item, unit): the cheapest store's product and price, then each store's lowest price
+    side by side. Both come from hash aggregations over the whole frame (a per-store min and an idxmin),
+    so the work grows linearly with the rows.
+    """
     if df.empty:
         return df
-
-    # Compute cheapest per (query, normalized_to)
-    def _pick(group: pd.DataFrame) -> pd.Series:
-        g = group.dropna(subset=["normalized_price"]).sort_values("normalized_price")
-        if g.empty:
-            return pd.Series({
-                "cheapest_store": None,
-                "cheapest_name": None,
-                "cheapest_price": None,
-                "cheapest_url": None,
-            })
-        row = g.iloc[0]
-        return pd.Series({
-            "cheapest_store": row["store"],
-            "cheapest_name": row["name"],
-            "cheapest_price": row["normalized_price"],
-            "cheapest_url": row["url"],
-        })
-
-    summary = (
-        df.groupby(["query", "normalized_to"])  # one item per row
-          .apply(_pick, include_groups=False)
-          .reset_index()
+    # The key columns are factorized once here rather than by each groupby; idxmin labels need a unique index
+    df = df.astype({key: "category" for key in SUMMARY_KEYS + ["store"]}).reset_index(drop=True)
+
+    # Each store's lowest price per item; items where nothing has a price keep a row of NaNs
+    pivot = (
+        df.groupby(SUMMARY_KEYS + ["store"], sort=False, observed=True)["normalized_price"].min()
+          .unstack("store")
+          .dropna(axis=1, how="all")
+          .sort_index(axis=1)
+          .rename_axis(columns=None)
     )
 
-    # Pivot to show each store's price side-by-side too
-    pivot = df.pivot_table(index=["query", "normalized_to"],
-                           columns="store",
-                           values="normalized_price",
-                           aggfunc="min")
-    out = summary.merge(pivot, on=["query", "normalized_to"], how="left")
-    return out.sort_values("query").reset_index(drop=True)
+    # The row holding each item's lowest price
+    priced = df.dropna(subset=["normalized_price"])
+    best = priced.loc[priced.groupby(SUMMARY_KEYS, sort=False, observed=True)["normalized_price"].idxmin(),
+                      SUMMARY_KEYS + ["store", "name", "normalized_price", "url"]]
+    summary = best.set_index(SUMMARY_KEYS).rename(columns={"store": "cheapest_store", "name": "cheapest_name",
+                                                           "normalized_price": "cheapest_price", "url": "cheapest_url"})
+
+    out = summary.reindex(pivot.index).join(pivot).reset_index()
+    out = out.astype({column: object for column in SUMMARY_KEYS + ["cheapest_store"]})
+    return out.sort_values(SUMMARY_KEYS).reset_index(drop=True)
+
+
+def pick_cheapest_file(path: str, chunk_rows: int = CHUNK_ROWS) -> pd.DataFrame:
+    """
+    pick_cheapest over a result file read chunk_rows rows at a time: each chunk is cut down to the lowest
+    price per (ZIP, item, unit, store) as it is read, which is all the summary needs.
+    """
+    keys = SUMMARY_KEYS + ["store"]
+
+    def lowest(df: pd.DataFrame) -> pd.DataFrame:
+        # Unpriced rows sort last, so a store still shows up (with no price) when none of its rows has one
+        return df.sort_values("normalized_price", na_position="last", kind="stable").drop_duplicates(keys)
+
+    reduced = [lowest(chunk) for chunk in read_results(path, chunk_rows)]
+    return pick_cheapest(lowest(pd.concat(reduced, ignore_index=True))) if reduced else pd.DataFrame()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Compare grocery prices across stores.")
+    parser.add_argument("--items", metavar="PATH", help="Item catalog (CSV or YAML with name, normalize_to); default: ITEMS")
+    parser.add_argument("--locations", metavar="PATH", help="Locations to price in (CSV or YAML with zip, city, state); default: ZIP_CODE")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes, each with its own browser")
+    parser.add_argument("--partition-items", type=int, default=PARTITION_ITEMS, help="Items per partition of work")
+    parser.add_argument("--output", default="grocery_prices.csv", metavar="PATH",
+                        help="Result file, appended to as searches finish (.csv, or .jsonl for JSON Lines)")
+    parser.add_argument("--resume", action="store_true", help="Keep the result file and skip the (item, store) pairs already in it")
+    parser.add_argument("--fixtures", nargs="?", const="local", metavar="URL",
+                        help="Scrape local fixture pages: served in-process, or from a running fixture_server.py at URL")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY, help="Pages open at once")
+    parser.add_argument("--timeout", type=float, default=TASK_TIMEOUT_S, help="Seconds allowed per search")
+    parser.add_argument("--retries", type=int, default=RETRIES, help="Retries per search after a failure or timeout")
+    parser.add_argument("--no-block", action="store_true", help="Load images, fonts, ads and trackers too")
+    parser.add_argument("--no-api", action="store_true", help="Always scrape the search pages, never the store APIs")
+    parser.add_argument("--cache", metavar="PATH",
+                        help=f"SQLite cache of results (default {DEFAULT_CACHE_PATH}; fixture runs are uncached unless given)")
+    parser.add_argument("--no-cache", action="store_true", help="Scrape everything and don't record results")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL_S / 3600, help="Hours a cached result stays fresh")
+    parser.add_argument("--refresh", action="store_true", help="Re-scrape everything, ignoring cached results")
+    parser.add_argument("--history", action="store_true", help="Also save the cached price history to grocery_price_history.csv")
+    return parser.parse_args()
 
 
 def main():
-    df = asyncio.run(fetch_all())
-    if df.empty:
+    args = parse_arguments()
+    items = load_items(args.items) if args.items else ITEMS
+    locations = load_locations(args.locations) if args.locations else [DEFAULT_LOCATION]
+    cache_path = args.cache or (None if args.fixtures else DEFAULT_CACHE_PATH)
+    if args.no_cache:
+        cache_path = None
+    options = {"concurrency": args.concurrency, "timeout": args.timeout, "retries": args.retries,
+               "block_requests": not args.no_block, "refresh": args.refresh, "use_api": not args.no_api}
+
+    with contextlib.ExitStack() as stack:
+        if args.fixtures:
+            from fixture_server import fixture_urls, serve_fixtures
+            root = stack.enter_context(serve_fixtures()) if args.fixtures == "local" else args.fixtures.rstrip('/')
+            options["base_urls"], options["api_urls"] = fixture_urls(root)
+        print(f"Searching {len(items)} items at {len(locations)} location(s)")
+        fetch_catalog(items, locations, args.output, workers=args.workers, partition_items=args.partition_items,
+                      cache_path=cache_path, ttl_s=args.ttl * 3600, resume=args.resume, **options)
+
+    if cache_path and args.history:
+        cache = PriceCache(cache_path)
+        zip_codes = [location["zip"] for location in locations]
+        cache.history().query("zip_code in @zip_codes").to_csv("grocery_price_history.csv", index=False)
+        cache.close()
+        print("Saved: grocery_price_history.csv")
+    cheap = pick_cheapest_file(args.output)
+    if cheap.empty:
         print("No results collected — sites may have blocked the session or selectors need updates.")
         return
 
-    df.to_csv("grocery_prices.csv", index=False)
-    cheap = pick_cheapest(df)
     cheap.to_csv("grocery_cheapest.csv", index=False)
 
     # Pretty print
-    cols = ["query", "normalized_to", "cheapest_store", "cheapest_price"]
+    cols = ["zip_code", "query", "normalized_to", "cheapest_store", "cheapest_price"]
     print("\nCheapest per item (normalized):")
-    print(cheap[cols].to_string(index=False))
-    print("\nSaved: grocery_prices.csv, grocery_cheapest.csv")
+    print(cheap[cols].to_string(index=False, max_rows=60))
+    print(f"\nSaved: {args.output}, grocery_cheapest.csv")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+"""
+Pick the product that best matches each search from the top results a store returned.
+
+Every candidate name is scored against its search query with rapidfuzz's token_set_ratio (0-100,
+word order and extra words like brand or size don't count against it), plus a bonus when the name
+contains one of the preferred brands. Ties go to the store's own ranking. All searches are scored
+together: one process.cdist call for the queries and one for the brands, over every candidate of
+every item and store.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process, utils
+
+MIN_MATCH_SCORE = 60.0
+BRAND_BONUS = 5.0
+# Per position in the store's result list, so equal scores keep the store's order
+RANK_PENALTY = 0.01
+
+
+def best_matches(queries: Sequence[str], candidate_names: Sequence[Sequence[str]], prefer_brands: Sequence[str] = (),
+                 min_score: float = MIN_MATCH_SCORE) -> List[Tuple[Optional[int], Optional[float]]]:
+    """
+    For every search (queries[i] with its candidates candidate_names[i], in the store's order), the index
+    of the best candidate and its score, or (None, None) when nothing scores at least min_score.
+    """
+    counts = np.array([len(names) for names in candidate_names], dtype=np.int64)
+    names = [name or "" for group in candidate_names for name in group]
+    if not names:
+        return [(None, None)] * len(queries)
+
+    owner = np.repeat(np.arange(len(queries)), counts)
+    rank = np.arange(len(names)) - np.repeat(np.cumsum(counts) - counts, counts)
+    unique_queries, query_index = np.unique(np.asarray(queries, dtype=object).astype(str), return_inverse=True)
+
+    # Scored against every query at once; each candidate keeps its own query's column
+    scores = process.cdist(list(unique_queries), names, scorer=fuzz.token_set_ratio, processor=utils.default_process,
+                           dtype=np.float32, workers=-1)
+    score = scores[query_index[owner], np.arange(len(names))].astype(np.float64)
+    total = score - RANK_PENALTY * rank
+    if prefer_brands:
+        brand_scores = process.cdist(list(prefer_brands), names, scorer=fuzz.partial_ratio, processor=utils.default_process,
+                                     dtype=np.float32, workers=-1)
+        total += BRAND_BONUS * (brand_scores.max(axis=0) >= 100)
+    # Candidates under min_score can't be picked, however much brand bonus they get
+    total[score < min_score] = -np.inf
+
+    # Best candidate per search: sort by search, then by total descending, and keep the first of each
+    order = np.lexsort((-total, owner))
+    first = order[np.r_[True, owner[order][1:] != owner[order][:-1]]]
+    matches: List[Tuple[Optional[int], Optional[float]]] = [(None, None)] * len(queries)
+    for index in first.tolist():
+        if np.isfinite(total[index]):
+            matches[owner[index]] = (int(rank[index]), round(float(score[index]), 1))
+    return matches
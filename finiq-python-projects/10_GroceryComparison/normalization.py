@@ -0,0 +1,151 @@
+"""
+Unit normalization for grocery prices: turn a shelf price, product name and unit price text into a
+price per target unit ("per_lb", "per_oz", "per_count", "per_gal", "per_l").
+
+The unit price text ("$0.25/oz") is preferred; otherwise the package size in the name ("32 oz",
+"5 lb", "dozen") divides the shelf price. Every alias is matched by one precompiled regex, and
+conversions come from CONVERSIONS, a table over every (unit, target) pair of the same dimension.
+
+normalize_price does one row; normalize_frame does a whole DataFrame with vectorized string
+extraction and a table lookup, for large catalogs.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+UNIT_ALIASES = {
+    "lb": ["lb", "lbs", "pound", "pounds"],
+    "oz": ["oz", "ounce", "ounces"],
+    "gal": ["gal", "gallon", "gallons"],
+    "l": ["l", "liter", "liters", "litre", "litres"],
+    "count": ["ct", "count", "ea", "each", "doz", "dozen", "dozens"],
+}
+ALIAS_UNITS = {alias: unit for unit, aliases in UNIT_ALIASES.items() for alias in aliases}
+
+OZ_PER_LB = 16.0
+OZ_PER_GAL = 128.0
+L_PER_GAL = 3.78541
+
+# Size of each unit in its dimension's base unit (oz is both a weight and a fluid ounce)
+UNIT_SIZES = {
+    "weight": {"oz": 1.0, "lb": OZ_PER_LB},
+    "volume": {"oz": 1.0, "gal": OZ_PER_GAL, "l": OZ_PER_GAL / L_PER_GAL},
+    "count": {"count": 1.0},
+}
+TARGET_UNITS = {"per_lb": "lb", "per_oz": "oz", "per_count": "count", "per_gal": "gal", "per_l": "l"}
+
+# (unit, target) -> factor turning a price per unit into a price per target unit
+CONVERSIONS: Dict[Tuple[str, str], float] = {
+    (unit, target): sizes[target_unit] / size
+    for sizes in UNIT_SIZES.values()
+    for unit, size in sizes.items()
+    for target, target_unit in TARGET_UNITS.items() if target_unit in sizes
+}
+
+# Longest alias first, so "lbs" wins over "lb" and "liter" over "l"
+_ALIASES = "|".join(sorted(map(re.escape, ALIAS_UNITS), key=len, reverse=True))
+UNIT_RE = re.compile(rf"(?<![a-z])({_ALIASES})(?![a-z])")
+SIZE_RE = re.compile(rf"(?P<qty>[0-9]*\.?[0-9]+)\s*(?:fl\s*)?(?P<unit>{_ALIASES})\b")
+UNIT_PRICE_RE = re.compile(r"\$\s*(?P<value>[0-9]*\.?[0-9]+)\s*/\s*(?P<unit>[a-zA-Z]+)")
+DOZEN = 12.0
+DOZEN_ALIASES = ("doz", "dozen", "dozens")
+
+
+def identify_unit(text: str) -> Optional[str]:
+    m = UNIT_RE.search(text.lower())
+    return ALIAS_UNITS[m.group(1)] if m else None
+
+
+def extract_size(text: str) -> Tuple[Optional[float], Optional[str]]:
+    """Extract package size like '32 oz', '1 lb', '5 lb', '1 gal', '2 ct'."""
+    t = text.lower()
+    m = SIZE_RE.search(t)
+    if m:
+        unit = ALIAS_UNITS[m["unit"]]
+        qty = float(m["qty"])
+        return (qty * DOZEN if m["unit"] in DOZEN_ALIASES else qty), unit
+    if "dozen" in t:
+        return DOZEN, "count"
+    return None, None
+
+
+def convert_unit_price(value: float, src_unit: str, target_unit: str) -> Optional[float]:
+    factor = CONVERSIONS.get((src_unit, target_unit))
+    return value * factor if factor is not None else None
+
+
+def normalize_price(price_total: float, name: str, unit_price_text: Optional[str], target: str) -> Optional[float]:
+    """Return normalized price per target unit using either unit_price_text (preferred) or derived from package size."""
+    if unit_price_text:
+        m = UNIT_PRICE_RE.search(unit_price_text)
+        if m:
+            unit = ALIAS_UNITS.get(m["unit"].lower())
+            if unit:
+                return convert_unit_price(float(m["value"]), unit, target)
+
+    qty, unit = extract_size(name)
+    if qty and unit:
+        return convert_unit_price(price_total / qty, unit, target)
+    return None
+
+
+def extract_groups(values: pd.Series, pattern: re.Pattern) -> pd.DataFrame:
+    """
+    First match of pattern in every value, one column per named group (NaN where nothing matched).
+
+    Uses pyarrow's compiled regex kernel when pyarrow is installed (several times faster on large
+    columns), else pandas' str.extract.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        return values.astype(object).str.extract(pattern)
+    matches = pc.extract_regex(pa.array(values.astype(object), type=pa.string(), from_pandas=True), pattern.pattern)
+    # flatten() keeps the rows that didn't match null in every group column
+    return pd.DataFrame({field.name: column.to_numpy(zero_copy_only=False)
+                         for field, column in zip(matches.type, matches.flatten())}, index=values.index)
+
+
+def conversion_factors(units: pd.Series, targets: pd.Series) -> np.ndarray:
+    """CONVERSIONS looked up for whole columns; NaN where a unit can't be turned into its target."""
+    table = pd.Series(CONVERSIONS)
+    keys = pd.MultiIndex.from_arrays([units.fillna(""), targets.fillna("")])
+    return table.reindex(keys).to_numpy(dtype=np.float64)
+
+
+def normalize_frame(df: pd.DataFrame, price: str = "price_total", name: str = "name",
+                    unit_price: str = "unit_price_text", target: str = "normalized_to") -> pd.Series:
+    """normalize_price for every row of df at once; NaN where no price per target unit can be derived."""
+    if df.empty:
+        return pd.Series(np.nan, index=df.index, dtype=np.float64)
+    targets = df[target].astype(object)
+
+    # Unit price text first; a recognised unit decides the row even when it can't be converted
+    quoted = extract_groups(df[unit_price], UNIT_PRICE_RE)
+    quoted_units = quoted["unit"].str.lower().map(ALIAS_UNITS)
+    quoted_price = quoted["value"].astype(np.float64).to_numpy() * conversion_factors(quoted_units, targets)
+    has_quote = quoted_units.notna().to_numpy()
+
+    # Else the package size in the name, divided into the shelf price
+    names = df[name].astype("string").str.lower()
+    sizes = extract_groups(names, SIZE_RE)
+    size_aliases = sizes["unit"]
+    qty = sizes["qty"].astype(np.float64).to_numpy()
+    qty = np.where(size_aliases.isin(DOZEN_ALIASES).to_numpy(), qty * DOZEN, qty)
+    size_units = size_aliases.map(ALIAS_UNITS)
+    dozen = size_units.isna() & names.str.contains("dozen", regex=False).fillna(False)
+    qty = np.where(dozen.to_numpy(), DOZEN, qty)
+    size_units = size_units.mask(dozen, "count")
+    totals = pd.to_numeric(df[price], errors="coerce").to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sized_price = np.where(qty > 0, totals / qty, np.nan) * conversion_factors(size_units, targets)
+
+    # Rows without a shelf price aren't normalized at all, even when a unit price is quoted
+    priced = np.isfinite(totals) & (totals != 0)
+    return pd.Series(np.where(priced, np.where(has_quote, quoted_price, sized_price), np.nan), index=df.index, dtype=np.float64)
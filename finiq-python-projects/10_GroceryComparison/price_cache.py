@@ -0,0 +1,129 @@
+"""
+SQLite cache of scraped search results for grocery_price_compare.py.
+
+Two tables:
+- products: the latest result per (store, ZIP, query) with the time it was scraped. A search that
+  found nothing is cached too (found = 0), so it isn't retried on every run either.
+- price_history: every result ever scraped, one row per (store, ZIP, query, run), for tracking
+  prices across runs.
+
+A cached result is fresh while it is younger than the TTL; only stale or missing entries are scraped
+again, and a forced refresh ignores the cache for reading (results are still written).
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+DEFAULT_CACHE_PATH = "grocery_cache.sqlite"
+DEFAULT_TTL_S = 24 * 3600
+
+# ProductHit fields stored per result
+HIT_FIELDS = ("store", "query", "name", "price_total", "unit_price_text", "normalized_price", "normalized_to", "url",
+              "match_score")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    store_key TEXT NOT NULL,
+    zip_code TEXT NOT NULL,
+    search TEXT NOT NULL,
+    found INTEGER NOT NULL,
+    store TEXT,
+    query TEXT,
+    name TEXT,
+    price_total REAL,
+    unit_price_text TEXT,
+    normalized_price REAL,
+    normalized_to TEXT,
+    url TEXT,
+    match_score REAL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (store_key, zip_code, search)
+);
+CREATE TABLE IF NOT EXISTS price_history (
+    store_key TEXT NOT NULL,
+    zip_code TEXT NOT NULL,
+    search TEXT NOT NULL,
+    found INTEGER NOT NULL,
+    store TEXT,
+    query TEXT,
+    name TEXT,
+    price_total REAL,
+    unit_price_text TEXT,
+    normalized_price REAL,
+    normalized_to TEXT,
+    url TEXT,
+    match_score REAL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS price_history_key ON price_history (store_key, zip_code, search, fetched_at);
+"""
+
+COLUMNS = ("store_key", "zip_code", "search", "found") + HIT_FIELDS + ("fetched_at",)
+# Columns added after the first release, with their types, for upgrading older cache files
+ADDED_COLUMNS = {"match_score": "REAL"}
+
+
+class PriceCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_s: float = DEFAULT_TTL_S):
+        self.ttl_s = ttl_s
+        # Worker processes share the file: WAL lets them read while another writes, and writers wait their turn
+        self.connection = sqlite3.connect(path, timeout=60)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        # Older files lack the added columns; their found rows have no score and so are never fresh (see fresh)
+        with self.connection:
+            for table in ("products", "price_history"):
+                existing = {row[1] for row in self.connection.execute(f"PRAGMA table_info({table})")}
+                for column, column_type in ADDED_COLUMNS.items():
+                    if column not in existing:
+                        self.connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def fresh(self, zip_code: str, now: Optional[float] = None) -> Dict[Tuple[str, str], Optional[Dict]]:
+        """
+        {(store_key, query): hit fields, or None if nothing was found} for every entry within the TTL.
+        Hits cached before match scores were stored are left out, so they are scraped and scored again.
+        """
+        now = time.time() if now is None else now
+        rows = self.connection.execute(
+            f"SELECT store_key, search, found, {', '.join(HIT_FIELDS)} FROM products"
+            " WHERE zip_code = ? AND fetched_at >= ? AND (found = 0 OR match_score IS NOT NULL)",
+            (zip_code, now - self.ttl_s),
+        )
+        return {(store_key, search): dict(zip(HIT_FIELDS, fields)) if found else None
+                for store_key, search, found, *fields in rows}
+
+    def put(self, store_key: str, zip_code: str, search: str, hit: Optional[Dict], now: Optional[float] = None) -> None:
+        """Record one search result (hit fields, or None when the search found nothing)."""
+        now = time.time() if now is None else now
+        fields = [hit.get(field) for field in HIT_FIELDS] if hit else [None] * len(HIT_FIELDS)
+        row = (store_key, zip_code, search, int(hit is not None), *fields, now)
+        placeholders = ", ".join("?" * len(COLUMNS))
+        with self.connection:
+            self.connection.execute(f"INSERT OR REPLACE INTO products ({', '.join(COLUMNS)}) VALUES ({placeholders})", row)
+            self.connection.execute(f"INSERT INTO price_history ({', '.join(COLUMNS)}) VALUES ({placeholders})", row)
+
+    def history(self, zip_code: Optional[str] = None, searches: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Every scraped result (found ones only), oldest first, optionally for one ZIP and some queries."""
+        sql = f"SELECT {', '.join(COLUMNS)} FROM price_history WHERE found = 1"
+        params = []
+        if zip_code is not None:
+            sql += " AND zip_code = ?"
+            params.append(zip_code)
+        if searches is not None:
+            searches = list(searches)
+            sql += f" AND search IN ({', '.join('?' * len(searches))})"
+            params.extend(searches)
+        df = pd.read_sql_query(sql + " ORDER BY fetched_at", self.connection, params=params)
+        df["fetched_at"] = pd.to_datetime(df["fetched_at"], unit="s")
+        return df.drop(columns="found")
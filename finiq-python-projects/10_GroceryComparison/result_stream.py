@@ -0,0 +1,81 @@
+"""
+Append-only result file for grocery_price_compare.py: CSV, or JSON Lines when the name ends in .jsonl.
+
+Rows are appended as they are found (ResultSink), so an interrupted run keeps everything it got; a search
+that completed without a match gets a row too, with no product.
+A resumed run skips every search that already has a row (read_done), matched or not. Failed searches
+have none, so they are tried again.
+Results are read back in chunks (read_results), so a large catalog's results never have to fit in
+memory at once.
+Worker processes share one file: pass the same lock to each process (set_lock) and every batch of
+rows is written as one locked append.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+from typing import Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+CHUNK_ROWS = 200_000
+
+# Column order of the result file
+RESULT_COLUMNS = ["zip_code", "store", "query", "name", "price_total", "unit_price_text", "normalized_price",
+                  "normalized_to", "url", "match_score"]
+RESULT_DTYPES = {"zip_code": str, "store": str, "query": str, "name": str, "unit_price_text": str,
+                 "normalized_to": str, "url": str}
+
+_lock = None
+
+
+def set_lock(lock) -> None:
+    """Share a multiprocessing lock between the processes writing one file (a ProcessPoolExecutor initializer)."""
+    global _lock
+    _lock = lock
+
+
+def is_jsonl(path: str) -> bool:
+    return path.lower().endswith((".jsonl", ".ndjson"))
+
+
+class ResultSink:
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        df = df.reindex(columns=RESULT_COLUMNS)
+        with _lock or contextlib.nullcontext():
+            with open(self.path, "a", newline="", encoding="utf-8") as file:
+                if is_jsonl(self.path):
+                    text = df.to_json(orient="records", lines=True)
+                    # Older pandas leave the last record without a newline; newer ones don't
+                    file.write(text if text.endswith("\n") else text + "\n")
+                else:
+                    df.to_csv(file, header=file.tell() == 0, index=False)
+
+
+def read_results(path: str, chunk_rows: int = CHUNK_ROWS, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """The result file chunk_rows rows at a time (nothing if it doesn't exist yet)."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    if is_jsonl(path):
+        # No type inference: strings (ZIP codes included) stay strings and nulls stay missing
+        with pd.read_json(path, lines=True, chunksize=chunk_rows, dtype=False) as reader:
+            for chunk in reader:
+                yield chunk[columns] if columns else chunk
+    else:
+        dtypes = {column: dtype for column, dtype in RESULT_DTYPES.items() if not columns or column in columns}
+        with pd.read_csv(path, chunksize=chunk_rows, usecols=columns, dtype=dtypes) as reader:
+            yield from reader
+
+
+def read_done(path: str, chunk_rows: int = CHUNK_ROWS) -> Set[Tuple[str, str, str]]:
+    """(zip_code, store, query) of every row already in the result file, for resuming a run."""
+    done = set()
+    for chunk in read_results(path, chunk_rows, ["zip_code", "store", "query"]):
+        done.update(zip(chunk["zip_code"], chunk["store"], chunk["query"]))
+    return done
@@ -0,0 +1,187 @@
+"""
+JSON fast path for grocery_price_compare.py: read each store's search results from the JSON its own
+site uses, over one pooled async HTTP client, instead of rendering the page in Chromium.
+
+Every adapter is a pair of functions in API_ADAPTERS:
+- build(query, api_url) -> (url, params, headers) for the search request
+- parse(text, query, site) -> ProductHit fields of every result, in the store's order ([] if none)
+
+parse raises on anything it can't read (unexpected shape, results without prices), and so does a
+failed request; the caller then falls back to the Playwright scraper for that search.
+
+- Target: the RedSky search API (needs TARGET_API_KEY, the key the website sends)
+- Walmart: the __NEXT_DATA__ JSON embedded in the search page
+- Safeway: the Albertsons product search API (needs SAFEWAY_API_KEY)
+- QFC / Fred Meyer: the Kroger products API (needs KROGER_API_TOKEN and a location for prices)
+
+fixture_server.py serves recorded responses in the same shapes under /api/<store>.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+API_TIMEOUT_S = 10
+API_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Accept": "application/json, text/html;q=0.9",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+STORE_API_URLS = {
+    "target": "https://redsky.target.com/redsky_aggregations/v1/web/plp_search_v2",
+    "walmart": "https://www.walmart.com/search",
+    "safeway": "https://www.safeway.com/abs/pub/xapi/pgmsearch/v1/search/products",
+    "qfc": "https://api.kroger.com/v1/products",
+    "fredmeyer": "https://api.kroger.com/v1/products",
+}
+
+# Store the prices are for (optional; the APIs fall back to a default store or omit prices)
+TARGET_STORE_ID = os.environ.get("TARGET_STORE_ID")
+SAFEWAY_STORE_ID = os.environ.get("SAFEWAY_STORE_ID")
+KROGER_LOCATION_IDS = {"qfc": os.environ.get("QFC_LOCATION_ID"), "fredmeyer": os.environ.get("FREDMEYER_LOCATION_ID")}
+
+PRICE_RE = re.compile(r"\$\s*([0-9]*\.?[0-9]+)")
+NEXT_DATA_RE = re.compile(r'<script id="__NEXT_DATA__" type="application/json">(.*?)</script>', re.DOTALL)
+
+Request = Tuple[str, Dict[str, str], Dict[str, str]]
+
+
+def open_client(max_connections: int):
+    """Pooled HTTP client shared by every API search (needs httpx)."""
+    import httpx
+
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    return httpx.AsyncClient(limits=limits, timeout=API_TIMEOUT_S, headers=API_HEADERS, follow_redirects=True)
+
+
+def hit_fields(store: str, query: str, name: str, price_total: Optional[float], unit_price_text: Optional[str],
+               url: str) -> Dict:
+    return {"store": store, "query": query, "name": name.strip(), "price_total": None if price_total is None else float(price_total),
+            "unit_price_text": unit_price_text, "normalized_price": None, "normalized_to": "", "url": url}
+
+
+def priced(store: str, hits: List[Dict]) -> List[Dict]:
+    """The hits that have a price; results that all lack one mean the API isn't usable (e.g. no store set)."""
+    with_price = [hit for hit in hits if hit["price_total"] is not None]
+    if hits and not with_price:
+        raise ValueError(f"{store} results without prices")
+    return with_price
+
+
+def absolute_url(site: str, href: str) -> str:
+    return f"{site}{href}" if href.startswith("/") else href
+
+
+# ---- Target (RedSky) ----
+
+def target_request(query: str, api_url: str) -> Request:
+    params = {"keyword": query, "channel": "WEB", "count": "24", "offset": "0", "page": f"/s/{query}"}
+    if os.environ.get("TARGET_API_KEY"):
+        params["key"] = os.environ["TARGET_API_KEY"]
+    if TARGET_STORE_ID:
+        params["pricing_store_id"] = TARGET_STORE_ID
+    return api_url, params, {}
+
+
+def parse_target(text: str, query: str, site: str) -> List[Dict]:
+    hits = []
+    for product in json.loads(text)["data"]["search"]["products"]:
+        price = product["price"]
+        unit_price = price.get("formatted_unit_price")
+        unit_price_text = f"{unit_price}{price.get('formatted_unit_price_suffix', '')}" if unit_price else None
+        hits.append(hit_fields("Target", query, product["item"]["product_description"]["title"], price.get("current_retail"),
+                               unit_price_text, absolute_url(site, product["item"]["enrichment"]["buy_url"])))
+    return priced("Target", hits)
+
+
+# ---- Walmart (search page data) ----
+
+def walmart_request(query: str, api_url: str) -> Request:
+    return api_url, {"q": query}, {"Accept": "text/html"}
+
+
+def parse_walmart(text: str, query: str, site: str) -> List[Dict]:
+    match = NEXT_DATA_RE.search(text)
+    if not match:
+        raise ValueError("Walmart page without __NEXT_DATA__ (probably a bot check)")
+    stacks = json.loads(match.group(1))["props"]["pageProps"]["initialData"]["searchResult"]["itemStacks"]
+    hits = []
+    for item in (item for stack in stacks for item in stack["items"]):
+        if item.get("__typename", "Product") != "Product":
+            continue
+        price_info = item.get("priceInfo") or {}
+        price = item.get("price")
+        if price is None and price_info.get("linePrice"):
+            m = PRICE_RE.search(price_info["linePrice"].replace(",", ""))
+            price = float(m.group(1)) if m else None
+        hits.append(hit_fields("Walmart", query, item["name"], price, price_info.get("unitPrice") or None,
+                               absolute_url(site, item["canonicalUrl"])))
+    return priced("Walmart", hits)
+
+
+# ---- Safeway (Albertsons product search) ----
+
+def safeway_request(query: str, api_url: str) -> Request:
+    params = {"q": query, "rows": "30", "start": "0", "channel": "instore", "banner": "safeway"}
+    if SAFEWAY_STORE_ID:
+        params["storeid"] = SAFEWAY_STORE_ID
+    key = os.environ.get("SAFEWAY_API_KEY")
+    return api_url, params, {"ocp-apim-subscription-key": key} if key else {}
+
+
+def parse_safeway(text: str, query: str, site: str) -> List[Dict]:
+    hits = []
+    for doc in json.loads(text)["response"]["docs"]:
+        unit_price_text = f"${doc['pricePer']:.2f}/{doc['unitOfMeasure'].lower()}" if doc.get("pricePer") and doc.get("unitOfMeasure") else None
+        hits.append(hit_fields("Safeway", query, doc["name"], doc.get("price"), unit_price_text,
+                               f"{site}/shop/product-details.{doc['pid']}.html"))
+    return priced("Safeway", hits)
+
+
+# ---- QFC / Fred Meyer (Kroger products API) ----
+
+def kroger_request(query: str, api_url: str, banner: str) -> Request:
+    params = {"filter.term": query, "filter.limit": "10"}
+    if KROGER_LOCATION_IDS.get(banner):
+        params["filter.locationId"] = KROGER_LOCATION_IDS[banner]
+    token = os.environ.get("KROGER_API_TOKEN")
+    return api_url, params, {"Authorization": f"Bearer {token}"} if token else {}
+
+
+def parse_kroger(text: str, query: str, site: str, banner: str) -> List[Dict]:
+    store = "QFC" if banner == "qfc" else "Fred Meyer"
+    hits = []
+    for product in json.loads(text)["data"]:
+        item = product["items"][0]
+        price = item.get("price") or {}
+        # The API has no unit price; the size goes into the name so it can be derived from it
+        name = product["description"]
+        if item.get("size") and item["size"].lower() not in name.lower():
+            name = f"{name} {item['size']}"
+        hits.append(hit_fields(store, query, name, price.get("promo") or price.get("regular"), None,
+                               f"{site}/p/{product['productId']}"))
+    return priced(store, hits)
+
+
+# Store key -> (build request, parse response)
+API_ADAPTERS: Dict[str, Tuple[Callable[..., Request], Callable[..., List[Dict]]]] = {
+    "target": (target_request, parse_target),
+    "walmart": (walmart_request, parse_walmart),
+    "safeway": (safeway_request, parse_safeway),
+    "qfc": (functools.partial(kroger_request, banner="qfc"), functools.partial(parse_kroger, banner="qfc")),
+    "fredmeyer": (functools.partial(kroger_request, banner="fredmeyer"), functools.partial(parse_kroger, banner="fredmeyer")),
+}
+
+
+async def search_api(client, store: str, query: str, api_url: str, site: str, limit: int) -> List[Dict]:
+    """ProductHit fields of the top limit results from the store's API; raises if the API can't be used."""
+    build, parse = API_ADAPTERS[store]
+    url, params, headers = build(query, api_url)
+    response = await client.get(url, params=params, headers=headers)
+    response.raise_for_status()
+    return parse(response.text, query, site)[:limit]
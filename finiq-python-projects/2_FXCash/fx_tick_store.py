@@ -0,0 +1,178 @@
+"""
+Tick-level FX quote store backed by memory-mapped arrays.
+
+Quotes are kept per pair and per day as three flat binary files under
+<root>/<PAIR>/<YYYYMMDD>/: timestamp.i8 (int64 nanoseconds), bid.f8 and ask.f8 (float64).
+Ingestion appends to those files and re-sorts a day only if its timestamps arrive out of
+order. Lookups memory-map just the days they touch and binary-search the timestamps, so
+finding the arrival quote for millions of trades never loads a whole day into pandas.
+
+    python fx_tick_store.py ingest ticks/ quotes_20230609.csv quotes_20230610.parquet
+    python fx_tick_store.py info ticks/
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+CSV_CHUNK_ROWS = 1_000_000
+COLUMNS = {'timestamp': np.int64, 'bid': np.float64, 'ask': np.float64}
+EXTENSIONS = {'timestamp': '.i8', 'bid': '.f8', 'ask': '.f8'}
+NANOSECONDS_PER_DAY = 24 * 60 * 60 * 1_000_000_000
+
+
+def day_name(day_number):
+    """YYYYMMDD directory name for a day counted from the epoch."""
+    return np.datetime64(int(day_number), 'D').astype(str).replace('-', '')
+
+
+class TickStore:
+    def __init__(self, root):
+        self.root = root
+
+    def _day_dir(self, pair, day):
+        return os.path.join(self.root, pair.replace('/', ''), day)
+
+    def _path(self, pair, day, column):
+        return os.path.join(self._day_dir(pair, day), column + EXTENSIONS[column])
+
+    def pairs(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(os.listdir(self.root))
+
+    def days(self, pair):
+        pair_dir = os.path.join(self.root, pair.replace('/', ''))
+        return sorted(os.listdir(pair_dir)) if os.path.isdir(pair_dir) else []
+
+    def open_day(self, pair, day):
+        """Memory-mapped (timestamp, bid, ask) arrays for one pair and day, or None if not stored."""
+        if not os.path.exists(self._path(pair, day, 'timestamp')):
+            return None
+        arrays = []
+        for column, dtype in COLUMNS.items():
+            path = self._path(pair, day, column)
+            arrays.append(np.memmap(path, dtype=dtype, mode='r') if os.path.getsize(path) else np.empty(0, dtype))
+        return tuple(arrays)
+
+    def append(self, quotes):
+        """Append a DataFrame of timestamp, pair, bid, ask quotes; returns the number of rows stored."""
+        timestamps = pd.to_datetime(quotes['timestamp']).to_numpy().astype('datetime64[ns]').astype(np.int64)
+        # Days as integers; only one name per (pair, day) group is ever formatted
+        days = timestamps // NANOSECONDS_PER_DAY
+        frame = pd.DataFrame({'timestamp': timestamps, 'pair': quotes['pair'].to_numpy(), 'day': days,
+                              'bid': quotes['bid'].to_numpy(dtype=float), 'ask': quotes['ask'].to_numpy(dtype=float)})
+
+        for (pair, day), group in frame.groupby(['pair', 'day'], sort=False):
+            day = day_name(day)
+            os.makedirs(self._day_dir(pair, day), exist_ok=True)
+            existing = self.open_day(pair, day)
+            last_timestamp = existing[0][-1] if existing is not None and len(existing[0]) else None
+            del existing
+
+            for column, dtype in COLUMNS.items():
+                with open(self._path(pair, day, column), 'ab') as file:
+                    group[column].to_numpy(dtype=dtype).tofile(file)
+
+            new_timestamps = group['timestamp'].to_numpy()
+            in_order = np.all(np.diff(new_timestamps) >= 0) and (last_timestamp is None or new_timestamps[0] >= last_timestamp)
+            if not in_order:
+                self._sort_day(pair, day)
+        return len(frame)
+
+    def _sort_day(self, pair, day):
+        timestamp, bid, ask = (np.array(array) for array in self.open_day(pair, day))
+        order = np.argsort(timestamp, kind='stable')
+        for column, array in zip(COLUMNS, (timestamp, bid, ask)):
+            array[order].tofile(self._path(pair, day, column))
+
+    def ingest_file(self, path):
+        if path.endswith('.parquet'):
+            return self.append(pd.read_parquet(path, columns=['timestamp', 'pair', 'bid', 'ask']))
+        rows = 0
+        for chunk in pd.read_csv(path, usecols=['timestamp', 'pair', 'bid', 'ask'], chunksize=CSV_CHUNK_ROWS):
+            rows += self.append(chunk)
+        return rows
+
+    def last_quote_before(self, pair, day):
+        """(bid, ask) of the final quote on the latest stored day before day, or NaN if there is none."""
+        for earlier_day in reversed([stored_day for stored_day in self.days(pair) if stored_day < day]):
+            _, bid, ask = self.open_day(pair, earlier_day)
+            if len(bid):
+                return bid[-1], ask[-1]
+        return np.nan, np.nan
+
+    def asof(self, pairs, timestamps):
+        """
+        Last bid/ask at or before each timestamp (NaN when no earlier quote is stored).
+
+        pairs and timestamps are equal-length arrays; results come back in the same order.
+        Categorical pairs are used through their codes, which saves hashing a string per trade.
+        """
+        pairs = pd.Series(pairs)
+        if isinstance(pairs.dtype, pd.CategoricalDtype):
+            pair_codes, pair_names = pairs.cat.codes.to_numpy(), pairs.cat.categories
+        else:
+            pair_codes, pair_names = pd.factorize(pairs)
+        pair_names = pair_names.astype(str)
+        timestamps = pd.to_datetime(timestamps).to_numpy().astype('datetime64[ns]').astype(np.int64)
+        days = timestamps // NANOSECONDS_PER_DAY
+        bid = np.full(len(timestamps), np.nan)
+        ask = np.full(len(timestamps), np.nan)
+        if not len(timestamps):
+            return bid, ask
+
+        # One integer key per (pair, day): group the trades without building any strings per trade
+        first_day = days.min()
+        codes = pair_codes * (days.max() - first_day + 1) + (days - first_day)
+        order = np.argsort(codes, kind='stable')
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        for rows in np.split(order, boundaries):
+            # Missing pairs (code -1) have no quotes
+            if pair_codes[rows[0]] < 0:
+                continue
+            pair, day = pair_names[pair_codes[rows[0]]], day_name(days[rows[0]])
+            stored = self.open_day(pair, day)
+            if stored is None or not len(stored[0]):
+                positions = np.full(len(rows), -1)
+            else:
+                stored_timestamps, stored_bid, stored_ask = stored
+                positions = np.searchsorted(stored_timestamps, timestamps[rows], side='right') - 1
+                found = positions >= 0
+                bid[rows[found]] = stored_bid[positions[found]]
+                ask[rows[found]] = stored_ask[positions[found]]
+            # Before the day's first quote the previous stored day's close still stands
+            if (positions < 0).any():
+                bid[rows[positions < 0]], ask[rows[positions < 0]] = self.last_quote_before(pair, day)
+        return bid, ask
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Memory-mapped FX tick store.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help='Load bid/ask quote files (CSV or Parquet: timestamp, pair, bid, ask)')
+    ingest.add_argument('root', help='Tick store directory')
+    ingest.add_argument('files', nargs='+')
+
+    info = commands.add_parser('info', help='List stored pairs, days and quote counts')
+    info.add_argument('root', help='Tick store directory')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    store = TickStore(args.root)
+    if args.command == 'ingest':
+        for path in args.files:
+            print(f'{path}: {store.ingest_file(path)} quotes stored')
+    elif args.command == 'info':
+        for pair in store.pairs():
+            for day in store.days(pair):
+                print(f'{pair} {day}: {len(store.open_day(pair, day)[0])} quotes')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,14 @@
-import yfinance as yf
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+import price_store
 import pandas as pd
 
 def fetch_historical_stock_data(ticker, years=10):
     end_date = pd.Timestamp.now()
     start_date = end_date - pd.DateOffset(years=years)
 
-    stock_data = yf.download(ticker, start=start_date, end=end_date)
+    stock_data = price_store.download(ticker, start=start_date, end=end_date)
     return stock_data
 
 def save_to_excel(ticker, stock_data):
@@ -1,11 +1,11 @@
-import yfinance as yf
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from ticker_fetch import fetch_tickers
 import matplotlib.pyplot as plt
 
-def plot_stock_price(symbol, color):
-    stock = yf.Ticker(symbol)
-    historical_data = stock.history(period='10y')
-    company_name = stock.info['longName']
-    plt.plot(historical_data['Close'], color=color, label=company_name)
+def plot_stock_price(symbol, company_name, historical_prices, color):
+    plt.plot(historical_prices, color=color, label=company_name)
     plt.xlabel('Date')
     plt.ylabel('Stock Price')
     plt.title(f'Stock Price for {company_name} ({symbol})')
@@ -13,16 +13,25 @@ def plot_stock_price(symbol, color):
     plt.grid(True)
     plt.tight_layout()
 
-# Replace 'AAPL', 'SEB', 'AZO', 'BKNG', 'TPL', 'CABO', 'CMG', 'MKL', and 'MTD' 
+# Replace 'AAPL', 'SEB', 'AZO', 'BKNG', 'TPL', 'CABO', 'CMG', 'MKL', and 'MTD'
 # with the stock symbols of your choice
-plot_stock_price('AAPL', 'yellow')
-plot_stock_price('SEB', 'red')
-plot_stock_price('AZO', 'green')
-plot_stock_price('BKNG', 'blue')
-plot_stock_price('TPL', 'purple')
-plot_stock_price('CABO', 'orange')
-plot_stock_price('CMG', 'cyan')
-plot_stock_price('MKL', 'magenta')
-plot_stock_price('MTD', 'brown')
+stocks = [
+    ('AAPL', 'yellow'),
+    ('SEB', 'red'),
+    ('AZO', 'green'),
+    ('BKNG', 'blue'),
+    ('TPL', 'purple'),
+    ('CABO', 'orange'),
+    ('CMG', 'cyan'),
+    ('MKL', 'magenta'),
+    ('MTD', 'brown'),
+]
 
-plt.show()
\ No newline at end of file
+# Load 10 years of history and the company names for every symbol concurrently
+prices, names = fetch_tickers([symbol for symbol, _ in stocks])
+
+for symbol, color in stocks:
+    if symbol in prices:
+        plot_stock_price(symbol, names[symbol], prices[symbol].dropna(), color)
+
+plt.show()
@@ -1,4 +1,7 @@
-import yfinance as yf
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+import price_store
 import matplotlib.pyplot as plt
 
 def calculate_payoff(share_price, strike, coupon):
@@ -28,7 +31,7 @@ def main():
         return
 
     # Fetch share price data using yfinance
-    stock_data = yf.download(ticker, start='2022-01-01', end='2023-01-01')
+    stock_data = price_store.download(ticker, start='2022-01-01', end='2023-01-01')
     share_prices = stock_data['Adj Close']
 
     # Create share price scenarios
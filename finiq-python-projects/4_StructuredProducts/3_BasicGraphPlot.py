@@ -1,13 +1,16 @@
-import yfinance as yf
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+import price_store
 import matplotlib.pyplot as plt
 
 def main():
     ticker = input("Enter the ticker: ")
 
     # Fetch share price data using yfinance for each date range
-    stock_data_green = yf.download(ticker, start='2022-01-01', end='2023-01-01')
-    stock_data_yellow = yf.download(ticker, start='2021-01-01', end='2022-01-01')
-    stock_data_red = yf.download(ticker, start='2020-01-01', end='2021-01-01')
+    stock_data_green = price_store.download(ticker, start='2022-01-01', end='2023-01-01')
+    stock_data_yellow = price_store.download(ticker, start='2021-01-01', end='2022-01-01')
+    stock_data_red = price_store.download(ticker, start='2020-01-01', end='2021-01-01')
 
     # Combine data for all three date ranges
     stock_data = stock_data_green._append(stock_data_yellow)._append(stock_data_red)
@@ -1,4 +1,7 @@
-import yfinance as yf
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+import price_store
 import matplotlib.pyplot as plt
 
 def calculate_payoff(share_price, strike):
@@ -12,7 +15,7 @@ def main():
     strike_percent = float(input("Enter the strike price percentage (in decimal): "))
 
     # Fetch share price data using yfinance
-    stock_data = yf.download(ticker, start='2021-01-01', end='2023-01-01')
+    stock_data = price_store.download(ticker, start='2021-01-01', end='2023-01-01')
 
     # Calculate the strike price based on user input
     initial_share_price = stock_data['Adj Close'][0]
@@ -8,7 +8,10 @@ draw a knockout line @ 103% of initial share price
 draw a knockin line @ 90% of inital share price
 """
 
-import yfinance as yf
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+import price_store
 import matplotlib.pyplot as plt
 import pandas as pd
 from dateutil.relativedelta import relativedelta
@@ -23,7 +26,7 @@ def main():
     # Fetch historical stock data using yfinance
     end_date = pd.Timestamp.now()
     start_date = end_date - relativedelta(months=int(tenor_years * 12))
-    stock_data = yf.download(ticker, start=start_date, end=end_date)
+    stock_data = price_store.download(ticker, start=start_date, end=end_date)
 
     # Calculate the strike price, knockout price, and knockin price
     initial_share_price = stock_data['Adj Close'][0]
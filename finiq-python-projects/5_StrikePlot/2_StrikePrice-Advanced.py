@@ -7,7 +7,10 @@ read strike price, knockout, knockin values from user
 draw lines for these as percentage of the initial share price
 """
 
-import yfinance as yf
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+import price_store
 import matplotlib.pyplot as plt
 import pandas as pd
 from dateutil.relativedelta import relativedelta
@@ -22,7 +25,7 @@ def main():
     # Fetch historical stock data using yfinance
     end_date = pd.Timestamp.now()
     start_date = end_date - relativedelta(months=int(tenor_years * 12))
-    stock_data = yf.download(ticker, start=start_date, end=end_date)
+    stock_data = price_store.download(ticker, start=start_date, end=end_date)
 
     # Plot the graph
     plt.figure(figsize=(12, 6))
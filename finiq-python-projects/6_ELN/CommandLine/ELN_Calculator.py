@@ -1,9 +1,12 @@
 import argparse
-import yfinance as yf
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+import price_store
 import matplotlib.pyplot as plt
 from dateutil.relativedelta import relativedelta
+import numpy as np
 import pandas as pd
-import sys
 
 def calculate_strike_price(initial_share_price, strike_percent):
     return initial_share_price * strike_percent
@@ -24,6 +27,53 @@ def calculate_final_outcome(stock_data, initial_share_price, strike_price, notio
 
     return valuation_date, spot_price_valuation_date, num_shares, profit, outcome
 
+def calculate_final_outcomes(price_paths, notional, strike_percent, issuer_percent):
+    """
+    Array version of calculate_final_outcome for whole grids of notes and price scenarios.
+
+    price_paths is a (scenarios, days) matrix of share prices (a single path may be 1-D),
+    notional/strike_percent/issuer_percent are scalars or vectors of length notes.
+    Every returned array has shape (notes, scenarios).
+    """
+    price_paths = np.atleast_2d(np.asarray(price_paths, dtype=float))
+    notional = np.atleast_1d(np.asarray(notional, dtype=float))[:, np.newaxis]
+    strike_percent = np.atleast_1d(np.asarray(strike_percent, dtype=float))[:, np.newaxis]
+    issuer_percent = np.atleast_1d(np.asarray(issuer_percent, dtype=float))[:, np.newaxis]
+
+    initial_share_price = price_paths[:, 0]
+    spot_price_valuation_date = price_paths[:, -1]
+
+    strike_price = calculate_strike_price(initial_share_price, strike_percent)
+    above_strike = spot_price_valuation_date > strike_price
+
+    # Profit Case above strike, Loss Case (shares delivered at strike) otherwise
+    profit = np.where(above_strike, notional - (notional * issuer_percent), 0.0)
+    num_shares = np.where(above_strike, 0.0, notional / strike_price)
+
+    return {
+        'strike_price': strike_price,
+        'spot_price_valuation_date': np.broadcast_to(spot_price_valuation_date, above_strike.shape),
+        'above_strike': above_strike,
+        'num_shares': num_shares,
+        'profit': profit,
+    }
+
+def write_output_file(output_file, ticker, stock_data, notional, strike_percent, strike_price, issuer_percent,
+                      initial_share_price, valuation_date, spot_price_valuation_date, outcome):
+    with open(output_file, 'w') as file:
+        file.write(f'Ticker: {ticker}\n')
+        file.write(f'Notional: {notional:.2f}\n')
+        file.write(f'Spot Price on Initial Date ({stock_data.index[0].strftime("%d-%b-%Y")}): {initial_share_price:.2f}\n')
+        file.write(f'Spot Price on Valuation Date ({valuation_date.strftime("%d-%b-%Y")}): {spot_price_valuation_date:.2f}\n')
+        file.write(f'Number of Days between Valuation Date and Initial Date: {len(stock_data)} days\n')
+        file.write(f'Strike %: {strike_percent*100:.2f}\n')
+        file.write(f'Strike Price: {strike_price:.2f}\n')
+        file.write(f'Issuer %: {issuer_percent*100:.2f}\n')
+        file.write(f'Share Price {"ABOVE" if spot_price_valuation_date > strike_price else "BELOW"} Strike Price on Valuation Date\n')
+        file.write(f'\n')
+        file.write(f'Final Outcome:\n')
+        file.write(f'{outcome}\n')
+
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Calculate ELN (Equity-Linked Note) outcomes.')
     parser.add_argument('ticker', type=str, help='Stock ticker symbol')
@@ -41,7 +91,7 @@ def main():
     # Fetch historical stock data using yfinance
     end_date = pd.Timestamp.now()
     start_date = end_date - relativedelta(months=int(tenor_years * 12))
-    stock_data = yf.download(ticker, start=start_date, end=end_date)
+    stock_data = price_store.download(ticker, start=start_date, end=end_date)
 
     # Calculate the share price at the start of every month
     monthly_data = stock_data['Adj Close'].resample('MS').first()
@@ -69,19 +119,8 @@ def main():
 
     # Save the details in a .txt file
     output_file = f'{ticker}_ELN_Output.txt'
-    with open(output_file, 'w') as file:
-        file.write(f'Ticker: {ticker}\n')
-        file.write(f'Notional: {notional:.2f}\n')
-        file.write(f'Spot Price on Initial Date ({stock_data.index[0].strftime("%d-%b-%Y")}): {initial_share_price:.2f}\n')
-        file.write(f'Spot Price on Valuation Date ({valuation_date.strftime("%d-%b-%Y")}): {spot_price_valuation_date:.2f}\n')
-        file.write(f'Number of Days between Valuation Date and Initial Date: {len(stock_data)} days\n')
-        file.write(f'Strike %: {strike_percent*100:.2f}\n')
-        file.write(f'Strike Price: {strike_price:.2f}\n')
-        file.write(f'Issuer %: {issuer_percent*100:.2f}\n')
-        file.write(f'Share Price {"ABOVE" if spot_price_valuation_date > strike_price else "BELOW"} Strike Price on Valuation Date\n')
-        file.write(f'\n')
-        file.write(f'Final Outcome:\n')
-        file.write(f'{outcome}\n')
+    write_output_file(output_file, ticker, stock_data, notional, strike_percent, strike_price, issuer_percent,
+                      initial_share_price, valuation_date, spot_price_valuation_date, outcome)
 
     print(f'Final outcome details saved to {output_file}')
 
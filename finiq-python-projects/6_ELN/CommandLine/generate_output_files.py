@@ -1,24 +1,103 @@
+import argparse
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
 import openpyxl
-import subprocess
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+import price_store
+
+from ELN_Calculator import calculate_strike_price, calculate_final_outcome, write_output_file
 
 def read_excel(filename):
-    workbook = openpyxl.load_workbook(filename)
+    # data_only=True so formula cells (e.g. '=B2+0.1') come back as their computed values
+    workbook = openpyxl.load_workbook(filename, data_only=True)
     sheet = workbook.active
     data = []
     for row in sheet.iter_rows(min_row=2, values_only=True):
         data.append(row)
     return data
 
-def run_eln_command(ticker, tenor, notional, strike, issuer):
-    command = f"ELN_Calculator.py {ticker} {tenor} {notional} {strike} {issuer}"
-    subprocess.run(command, shell=True)
+def tenor_start_date(end_date, tenor):
+    return end_date - relativedelta(months=int(tenor * 12))
 
-def generate_output_files(input_file):
-    parameters = read_excel(input_file)
+def group_by_ticker(parameters):
+    # Each ticker's notes are numbered so repeated tickers don't overwrite each other's output file
+    groups = defaultdict(list)
     for record in parameters:
         ticker, tenor, notional, strike, issuer = record
-        run_eln_command(ticker, tenor, notional, strike, issuer)
+        groups[ticker].append(record)
+
+    jobs = {}
+    for ticker, records in groups.items():
+        jobs[ticker] = []
+        for note_number, (_, tenor, notional, strike, issuer) in enumerate(records, start=1):
+            if len(records) == 1:
+                output_file = f'{ticker}_ELN_Output.txt'
+            else:
+                output_file = f'{ticker}_ELN_Output_{note_number}.txt'
+            jobs[ticker].append((output_file, float(tenor), float(notional), float(strike), float(issuer)))
+    return jobs
+
+def price_notes(ticker, stock_data, notes, end_date):
+    # Prices a batch of notes for one ticker against an already downloaded price history
+    output_files = []
+    for output_file, tenor, notional, strike, issuer in notes:
+        start_date = tenor_start_date(end_date, tenor)
+        note_data = stock_data[stock_data.index >= start_date.normalize()]
+
+        strike_percent = strike / 100
+        issuer_percent = issuer / 100
+        initial_share_price = note_data['Adj Close'][0]
+        strike_price = calculate_strike_price(initial_share_price, strike_percent)
+
+        valuation_date, spot_price_valuation_date, num_shares, profit, outcome = calculate_final_outcome(
+            note_data, initial_share_price, strike_price, notional, issuer_percent
+        )
+        write_output_file(output_file, ticker, note_data, notional, strike_percent, strike_price, issuer_percent,
+                          initial_share_price, valuation_date, spot_price_valuation_date, outcome)
+        output_files.append(output_file)
+    return output_files
+
+def split_notes(notes, parts):
+    return [notes[i::parts] for i in range(parts) if notes[i::parts]]
+
+def generate_output_files(input_file, workers=1):
+    parameters = read_excel(input_file)
+    jobs = group_by_ticker(parameters)
+    end_date = pd.Timestamp.now()
+
+    # Download each ticker once, covering the longest tenor requested for it
+    histories = {}
+    for ticker, notes in jobs.items():
+        longest_tenor = max(note[1] for note in notes)
+        histories[ticker] = price_store.download(ticker, start=tenor_start_date(end_date, longest_tenor), end=end_date)
+
+    if workers <= 1:
+        for ticker, notes in jobs.items():
+            for output_file in price_notes(ticker, histories[ticker], notes, end_date):
+                print(f'Final outcome details saved to {output_file}')
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = []
+        for ticker, notes in jobs.items():
+            for chunk in split_notes(notes, workers):
+                futures.append(executor.submit(price_notes, ticker, histories[ticker], chunk, end_date))
+        for future in futures:
+            for output_file in future.result():
+                print(f'Final outcome details saved to {output_file}')
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Generate ELN output files for every row of an input workbook.')
+    parser.add_argument('input_file', nargs='?', default='Input_Parameters.xlsx', help='Excel file with Ticker, Tenor, Notional, Strike, Issuer columns')
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes used to price the notes')
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    input_file = "Input_Parameters.xlsx"
-    generate_output_files(input_file)
\ No newline at end of file
+    args = parse_arguments()
+    generate_output_files(args.input_file, args.workers)
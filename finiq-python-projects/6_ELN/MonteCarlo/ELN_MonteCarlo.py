@@ -0,0 +1,199 @@
+"""
+Monte Carlo pricer for an ELN with optional knock-in and knock-out barriers
+
+simulate N share price paths for the tenor, either GBM or bootstrapped from the ticker's daily history
+all levels (strike, knock-in, knock-out) are percentages of the Spot Price on Initial Date
+CASE KO: if the share price touches the knock-out level on any day, the note redeems early at full notional
+CASE 1: if above strike on valuation date (or knock-in never touched): investor receives full notional
+CASE 2: otherwise investor receives shares. Number of shares = notional / strike price
+Payoff reported per path = value received at redemption - invested amount (notional * issuer %)
+
+print expected payoff, its standard error, percentiles and the probability of each case
+paths are generated in chunks so memory stays bounded (one float64 buffer of chunk x days per worker,
+~20 MB per year of tenor at the default 10,000 paths), every chunk has its own seed derived from --seed
+so results are identical for any number of --workers
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+import price_store
+
+TRADING_DAYS_PER_YEAR = 252
+CHUNK_SIZE = 10_000
+HISTOGRAM_BINS = 2000
+
+def simulate_gbm_paths(rng, num_paths, num_days, mu, sigma):
+    # Share price relative to the initial price (1.0), one row per path
+    # Shocks become log returns, then cumulative returns, then prices, all in the one buffer
+    dt = 1 / TRADING_DAYS_PER_YEAR
+    paths = rng.standard_normal((num_paths, num_days))
+    paths *= sigma * np.sqrt(dt)
+    paths += (mu - 0.5 * sigma ** 2) * dt
+    np.cumsum(paths, axis=1, out=paths)
+    return np.exp(paths, out=paths)
+
+def simulate_bootstrap_paths(rng, num_paths, num_days, historical_log_returns):
+    # Resample realized daily log returns with replacement
+    picks = rng.integers(0, len(historical_log_returns), size=(num_paths, num_days))
+    paths = historical_log_returns[picks]
+    del picks
+    np.cumsum(paths, axis=1, out=paths)
+    return np.exp(paths, out=paths)
+
+def evaluate_paths(paths, notional, strike_percent, issuer_percent, knockin_percent=None, knockout_percent=None):
+    """Vectorized payoff of every path in a (paths, days) matrix of relative share prices."""
+    final_price = paths[:, -1]
+    invested = notional * issuer_percent
+
+    if knockout_percent is not None:
+        knocked_out = paths.max(axis=1) >= knockout_percent
+    else:
+        knocked_out = np.zeros(len(paths), dtype=bool)
+
+    if knockin_percent is not None:
+        knocked_in = paths.min(axis=1) <= knockin_percent
+    else:
+        knocked_in = np.ones(len(paths), dtype=bool)
+
+    receives_shares = ~knocked_out & knocked_in & (final_price <= strike_percent)
+    num_shares = np.where(receives_shares, notional / strike_percent, 0.0)
+    redemption_value = np.where(receives_shares, num_shares * final_price, notional)
+
+    return {
+        'payoff': redemption_value - invested,
+        'knocked_out': knocked_out,
+        'knocked_in': knocked_in & ~knocked_out,
+        'receives_shares': receives_shares,
+    }
+
+def price_chunk(seed, num_paths, num_days, note, model):
+    rng = np.random.default_rng(seed)
+    if model['name'] == 'bootstrap':
+        paths = simulate_bootstrap_paths(rng, num_paths, num_days, model['log_returns'])
+    else:
+        paths = simulate_gbm_paths(rng, num_paths, num_days, model['mu'], model['sigma'])
+
+    result = evaluate_paths(paths, **note)
+
+    # Payoff is bounded below by -invested and above by notional - invested
+    invested = note['notional'] * note['issuer_percent']
+    histogram, _ = np.histogram(result['payoff'], bins=HISTOGRAM_BINS, range=(-invested, note['notional'] - invested))
+
+    return {
+        'paths': num_paths,
+        'payoff_sum': result['payoff'].sum(),
+        'payoff_sum_squares': np.square(result['payoff']).sum(),
+        'knocked_out': int(result['knocked_out'].sum()),
+        'knocked_in': int(result['knocked_in'].sum()),
+        'receives_shares': int(result['receives_shares'].sum()),
+        'histogram': histogram,
+    }
+
+def run_simulation(num_paths, num_days, note, model, seed=None, chunk_size=CHUNK_SIZE, workers=1):
+    chunk_sizes = [chunk_size] * (num_paths // chunk_size)
+    if num_paths % chunk_size:
+        chunk_sizes.append(num_paths % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+
+    if workers <= 1:
+        chunks = [price_chunk(chunk_seed, size, num_days, note, model) for chunk_seed, size in zip(seeds, chunk_sizes)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(price_chunk, chunk_seed, size, num_days, note, model)
+                       for chunk_seed, size in zip(seeds, chunk_sizes)]
+            chunks = [future.result() for future in futures]
+
+    return summarize(chunks, note)
+
+def summarize(chunks, note):
+    total_paths = sum(chunk['paths'] for chunk in chunks)
+    mean = sum(chunk['payoff_sum'] for chunk in chunks) / total_paths
+    mean_square = sum(chunk['payoff_sum_squares'] for chunk in chunks) / total_paths
+    std = np.sqrt(max(mean_square - mean ** 2, 0.0))
+
+    invested = note['notional'] * note['issuer_percent']
+    histogram = np.sum([chunk['histogram'] for chunk in chunks], axis=0)
+    bin_edges = np.linspace(-invested, note['notional'] - invested, HISTOGRAM_BINS + 1)
+    cumulative = np.cumsum(histogram) / total_paths
+    percentiles = {
+        level: bin_edges[1:][min(np.searchsorted(cumulative, level / 100), HISTOGRAM_BINS - 1)]
+        for level in (1, 5, 25, 50, 75, 95, 99)
+    }
+
+    return {
+        'paths': total_paths,
+        'expected_payoff': mean,
+        'std_payoff': std,
+        'standard_error': std / np.sqrt(total_paths),
+        'percentiles': percentiles,
+        'prob_knocked_out': sum(chunk['knocked_out'] for chunk in chunks) / total_paths,
+        'prob_knocked_in': sum(chunk['knocked_in'] for chunk in chunks) / total_paths,
+        'prob_receives_shares': sum(chunk['receives_shares'] for chunk in chunks) / total_paths,
+        'histogram': histogram,
+        'bin_edges': bin_edges,
+    }
+
+def historical_log_returns(ticker, years):
+    start_date = pd.Timestamp.now() - pd.DateOffset(years=years)
+    stock_data = price_store.download(ticker, start=start_date)
+    return np.diff(np.log(stock_data['Adj Close'].dropna().to_numpy()))
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Monte Carlo pricing of an ELN with knock-in/knock-out barriers.')
+    parser.add_argument('tenor', type=float, help='Tenor in years')
+    parser.add_argument('notional', type=float, help='Notional amount')
+    parser.add_argument('strike', type=float, help='Strike price as a percentage')
+    parser.add_argument('issuer', type=float, help='Issuer price as a percentage')
+    parser.add_argument('--ticker', type=str, help='Calibrate volatility (or bootstrap returns) from this ticker\'s history')
+    parser.add_argument('--history-years', type=int, default=10, help='Years of history used with --ticker')
+    parser.add_argument('--knock-in', type=float, help='Knock-in level as a percentage')
+    parser.add_argument('--knock-out', type=float, help='Knock-out level as a percentage')
+    parser.add_argument('--model', choices=['gbm', 'bootstrap'], default='gbm', help='Path model')
+    parser.add_argument('--mu', type=float, default=0.0, help='Annual drift for GBM')
+    parser.add_argument('--sigma', type=float, default=0.3, help='Annual volatility for GBM (ignored with --ticker)')
+    parser.add_argument('--paths', type=int, default=100_000, help='Number of simulated paths')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='Paths generated per chunk')
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes')
+    parser.add_argument('--seed', type=int, help='Random seed')
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    num_days = int(round(args.tenor * TRADING_DAYS_PER_YEAR))
+
+    note = {
+        'notional': args.notional,
+        'strike_percent': args.strike / 100,
+        'issuer_percent': args.issuer / 100,
+        'knockin_percent': args.knock_in / 100 if args.knock_in is not None else None,
+        'knockout_percent': args.knock_out / 100 if args.knock_out is not None else None,
+    }
+
+    model = {'name': args.model, 'mu': args.mu, 'sigma': args.sigma}
+    if args.ticker:
+        log_returns = historical_log_returns(args.ticker, args.history_years)
+        model['sigma'] = log_returns.std() * np.sqrt(TRADING_DAYS_PER_YEAR)
+        model['log_returns'] = log_returns
+    elif args.model == 'bootstrap':
+        sys.exit('--model bootstrap needs --ticker')
+
+    result = run_simulation(args.paths, num_days, note, model, seed=args.seed, chunk_size=args.chunk_size, workers=args.workers)
+
+    print(f'Paths: {result["paths"]} ({args.model}, sigma {model["sigma"]*100:.2f}%, {num_days} days)')
+    print(f'Expected Payoff: {result["expected_payoff"]:.2f} (std error {result["standard_error"]:.2f})')
+    print(f'Payoff Std Dev: {result["std_payoff"]:.2f}')
+    for level, value in result['percentiles'].items():
+        print(f'  {level:>2}th percentile: {value:.2f}')
+    print(f'Probability Knocked Out: {result["prob_knocked_out"]*100:.2f}%')
+    print(f'Probability Knocked In: {result["prob_knocked_in"]*100:.2f}%')
+    print(f'Probability Investor Receives Shares: {result["prob_receives_shares"]*100:.2f}%')
+
+if __name__ == "__main__":
+    main()
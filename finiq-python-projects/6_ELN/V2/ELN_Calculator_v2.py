@@ -24,7 +24,10 @@ highlight the share price at the start of every month with a tiny purple start
 draw a line for strike price as a percentage of the initial share price
 """
 
-import yfinance as yf
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+import price_store
 import matplotlib.pyplot as plt
 from dateutil.relativedelta import relativedelta
 import pandas as pd
@@ -54,7 +57,7 @@ def main():
     # Fetch historical stock data using yfinance
     end_date = pd.Timestamp.now()
     start_date = end_date - relativedelta(months=int(tenor_years * 12))
-    stock_data = yf.download(ticker, start=start_date, end=end_date)
+    stock_data = price_store.download(ticker, start=start_date, end=end_date)
 
     # Calculate the share price at the start of every month
     monthly_data = stock_data['Adj Close'].resample('MS').first()
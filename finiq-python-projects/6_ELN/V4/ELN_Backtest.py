@@ -0,0 +1,101 @@
+"""
+Backtest the V4 ELN across every trading day of the history as the start date
+
+read ticker, tenor (in months), notional, strike percentage and issuer percentage from the command line
+fetch the ticker's history once (from the local price store) for the requested number of years
+for every trading day as Start Date, Valuation Date is the last trading day before Start Date + tenor
+CASE 1: if above strike on valuation date: Profit = Notional minus Issuer Price
+CASE 2: if at or below strike: investor receives Notional / Strike Price shares
+P&L = value received (notional, or shares at the valuation price) - invested amount (notional * issuer %)
+
+print a hit-rate and P&L table per start year and overall, save every start date to <ticker>_ELN_Backtest.csv
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'common'))
+import price_store
+from ELN_Calculator_v4 import calculate_strike_price
+
+def backtest(stock_data, tenor_months, notional, strike_percent, issuer_percent):
+    dates = stock_data.index
+    prices = stock_data['Adj Close'].to_numpy(dtype=float)
+
+    # Valuation index for every start date at once; windows running past the history are dropped
+    end_dates = dates + pd.DateOffset(months=int(tenor_months))
+    complete = end_dates <= dates[-1]
+    start_idx = np.flatnonzero(complete)
+    valuation_idx = dates.searchsorted(end_dates[complete]) - 1
+
+    initial_share_price = prices[start_idx]
+    spot_price_valuation_date = prices[valuation_idx]
+    strike_price = calculate_strike_price(initial_share_price, strike_percent)
+    above_strike = spot_price_valuation_date > strike_price
+
+    invested = notional * issuer_percent
+    num_shares = np.where(above_strike, 0.0, notional / strike_price)
+    profit = np.where(above_strike, notional - invested, 0.0)
+    redemption_value = np.where(above_strike, notional, num_shares * spot_price_valuation_date)
+
+    return pd.DataFrame({
+        'Start Date': dates[start_idx],
+        'Valuation Date': dates[valuation_idx],
+        'Spot Price on Initial Date': initial_share_price,
+        'Spot Price on Valuation Date': spot_price_valuation_date,
+        'Strike Price': strike_price,
+        'Above Strike': above_strike,
+        'Number of Shares': num_shares,
+        'Profit': profit,
+        'P&L': redemption_value - invested,
+    })
+
+def summarize(results):
+    def table(grouped):
+        return grouped.agg(**{
+            'Notes': ('P&L', 'size'),
+            'Hit Rate %': ('Above Strike', lambda above: above.mean() * 100),
+            'Avg P&L': ('P&L', 'mean'),
+            'Worst P&L': ('P&L', 'min'),
+            '5th Pct P&L': ('P&L', lambda pnl: pnl.quantile(0.05)),
+            'Median P&L': ('P&L', 'median'),
+            'Best P&L': ('P&L', 'max'),
+        })
+
+    by_year = table(results.groupby(results['Start Date'].dt.year.rename('Start Year')))
+    overall = table(results.groupby(lambda _: 'All'))
+    return pd.concat([by_year, overall])
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Backtest an ELN over every historical start date.')
+    parser.add_argument('ticker', type=str, help='Stock ticker symbol')
+    parser.add_argument('tenor', type=float, help='Tenor in months')
+    parser.add_argument('strike', type=float, help='Strike price as a percentage')
+    parser.add_argument('issuer', type=float, help='Issuer price as a percentage')
+    parser.add_argument('--notional', type=float, default=200000, help='Notional amount')
+    parser.add_argument('--years', type=int, default=15, help='Years of history to roll the note across')
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    start_date = pd.Timestamp.now() - pd.DateOffset(years=args.years)
+    stock_data = price_store.download(args.ticker, start=start_date).dropna(subset=['Adj Close'])
+
+    results = backtest(stock_data, args.tenor, args.notional, args.strike / 100, args.issuer / 100)
+    if results.empty:
+        print(f'Not enough history for a {int(args.tenor)} month note on {args.ticker}')
+        return
+
+    output_file = f'{args.ticker}_ELN_Backtest.csv'
+    results.to_csv(output_file, index=False)
+
+    print(f'{args.ticker} ELN backtest: {int(args.tenor)} months, Strike {args.strike:.2f}%, Issuer {args.issuer:.2f}%')
+    print(summarize(results).round(2).to_string())
+    print(f'\nEvery start date saved to {output_file}')
+
+if __name__ == "__main__":
+    main()
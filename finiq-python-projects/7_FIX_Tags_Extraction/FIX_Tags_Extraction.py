@@ -1,5 +1,5 @@
-import re
-import pandas as pd
+from fix_parser import iter_rows
+from fix_sinks import write_rows
 
 # Define the file path
 file_path = "FIX_Messages.log"
@@ -12,32 +12,14 @@ user_input = input("Enter comma-separated FIX tag numbers: ")
 
 # Remove any extra spaces and split the input into a list of tag numbers
 tags_to_extract = [int(tag.strip()) for tag in user_input.split(',')]
-# Initialize empty lists to store extracted data
-data = {tag: [] for tag in tags_to_extract}
-
-# Open and read the file
-with open(file_path, "r") as file:
-    lines = file.readlines()
-
-# Extract tag values from each line and store in the data dictionary
-for line in lines:
-    for tag in tags_to_extract:
-        #pattern = rf"{tag}=(\w+)"
-        pattern = rf"{tag}=(.*?)(?=|$)"
-        match = re.search(pattern, line)
- 
-        if match:
-            data[tag].append(match.group(1))
-        else:
-            data[tag].append(None)
-
-# Create a DataFrame from the data dictionary
-df = pd.DataFrame(data)
-
-# Specify the Excel file name
-excel_file_name = "extracted_data.xlsx"
-
-# Write the DataFrame to an Excel file
-df.to_excel(excel_file_name, index=False)
-
-print("Data extracted and written to Excel file:", excel_file_name)
+
+# Ask for the output file; the extension picks the format (.csv, .parquet, .arrow or .xlsx)
+output_file_name = input("Enter the output file name (default: extracted_data.csv): ").strip() or "extracted_data.csv"
+
+# Stream the log: each message is split once into tag -> value and only the requested tags are kept
+rows = iter_rows(file_path, tags_to_extract)
+
+# Write the rows in typed batches so memory stays flat for large logs
+row_count = write_rows(rows, output_file_name, tags_to_extract)
+
+print(f"{row_count} messages extracted and written to:", output_file_name)
@@ -0,0 +1,221 @@
+"""
+Persistent order/quote lifecycle index over FIX logs.
+
+While a log is parsed, every message's file and byte offset is stored in a SQLite index along
+with its MsgType (35), SendingTime (52) and the ids in ClOrdID (11), OrderID (37),
+OrigClOrdID (41), QuoteID (117) and QuoteReqID (131). Queries look ids up in the index and
+seek straight to the matching lines instead of rescanning the logs, and request -> response
+latency is computed from the indexed SendingTimes alone.
+
+    python fix_index.py build "logs/*.log"
+    python fix_index.py find 131 10001
+    python fix_index.py lifecycle ORD42
+    python fix_index.py latency --request R --response S --key 131 --output quote_latency.csv
+"""
+
+import argparse
+import os
+import sqlite3
+
+import pandas as pd
+
+from fix_ingest import expand_inputs
+from fix_parser import iter_messages, parse_message
+from fix_sinks import parse_timestamps
+
+DEFAULT_INDEX_PATH = 'fix_index.db'
+INDEX_TAGS = ['11', '37', '41', '117', '131']
+INSERT_BATCH_SIZE = 50_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE,
+    size INTEGER,
+    mtime REAL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER,
+    offset INTEGER,
+    msg_type TEXT,
+    sending_time TEXT
+);
+CREATE TABLE IF NOT EXISTS message_keys (
+    tag INTEGER,
+    value TEXT,
+    message_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS message_keys_lookup ON message_keys (tag, value);
+CREATE INDEX IF NOT EXISTS messages_file ON messages (file_id);
+"""
+
+
+class FixIndex:
+    def __init__(self, index_path=DEFAULT_INDEX_PATH):
+        self.connection = sqlite3.connect(index_path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def _forget_file(self, file_id):
+        self.connection.execute('DELETE FROM message_keys WHERE message_id IN (SELECT id FROM messages WHERE file_id = ?)', (file_id,))
+        self.connection.execute('DELETE FROM messages WHERE file_id = ?', (file_id,))
+        self.connection.execute('DELETE FROM files WHERE id = ?', (file_id,))
+
+    def add_file(self, path):
+        """Index one log; unchanged files are skipped, changed ones are re-indexed. Returns messages indexed."""
+        path = os.path.abspath(path)
+        size = os.path.getsize(path)
+        mtime = os.path.getmtime(path)
+
+        known = self.connection.execute('SELECT id, size, mtime FROM files WHERE path = ?', (path,)).fetchone()
+        if known and known[1] == size and known[2] == mtime:
+            return 0
+
+        self.connection.execute('PRAGMA synchronous = OFF')
+        with self.connection:
+            if known:
+                self._forget_file(known[0])
+            file_id = self.connection.execute('INSERT INTO files (path, size, mtime) VALUES (?, ?, ?)', (path, size, mtime)).lastrowid
+            next_id = (self.connection.execute('SELECT MAX(id) FROM messages').fetchone()[0] or 0) + 1
+
+            messages = []
+            keys = []
+            for offset, _, fields in iter_messages(path):
+                messages.append((next_id, file_id, offset, fields.get('35'), fields.get('52')))
+                for tag in INDEX_TAGS:
+                    if tag in fields:
+                        keys.append((int(tag), fields[tag], next_id))
+                next_id += 1
+                if len(messages) >= INSERT_BATCH_SIZE:
+                    self._insert(messages, keys)
+                    messages, keys = [], []
+            self._insert(messages, keys)
+
+        return self.connection.execute('SELECT COUNT(*) FROM messages WHERE file_id = ?', (file_id,)).fetchone()[0]
+
+    def _insert(self, messages, keys):
+        self.connection.executemany('INSERT INTO messages VALUES (?, ?, ?, ?, ?)', messages)
+        self.connection.executemany('INSERT INTO message_keys VALUES (?, ?, ?)', keys)
+
+    def locate(self, tag, values):
+        """(path, offset) of every message carrying tag=value for any of the values, in log order."""
+        values = list(values)
+        if not values:
+            return []
+        placeholders = ', '.join('?' * len(values))
+        return self.connection.execute(f"""
+            SELECT DISTINCT f.path, m.offset, m.id FROM message_keys k
+            JOIN messages m ON m.id = k.message_id
+            JOIN files f ON f.id = m.file_id
+            WHERE k.tag = ? AND k.value IN ({placeholders})
+            ORDER BY m.id
+        """, [int(tag), *values]).fetchall()
+
+    def read_messages(self, locations):
+        """Seek to each (path, offset) and parse the message found there."""
+        messages = []
+        handles = {}
+        try:
+            for path, offset, *_ in locations:
+                if path not in handles:
+                    handles[path] = open(path, 'rb')
+                handles[path].seek(offset)
+                log_time, fields = parse_message(handles[path].readline())
+                messages.append((log_time, fields))
+        finally:
+            for handle in handles.values():
+                handle.close()
+        return messages
+
+    def find(self, tag, value):
+        return self.read_messages(self.locate(tag, [value]))
+
+    def order_lifecycle(self, client_order_id):
+        """Every message of an order: by ClOrdID/OrigClOrdID, then everything sharing its OrderIDs."""
+        locations = {row[2]: row for row in self.locate(11, [client_order_id]) + self.locate(41, [client_order_id])}
+        order_ids = {fields['37'] for _, fields in self.read_messages(locations.values()) if '37' in fields}
+        for row in self.locate(37, order_ids):
+            locations[row[2]] = row
+        return self.read_messages([locations[message_id] for message_id in sorted(locations)])
+
+    def latency(self, request_type='R', response_type='S', key_tag=131):
+        """
+        Per key value, time from the first request message to the first response message.
+
+        R/S on 131 gives quote-request -> first-quote latency; D/8 on 11 gives order -> first execution report.
+        """
+        frame = pd.read_sql_query("""
+            SELECT k.value AS key,
+                   MIN(CASE WHEN m.msg_type = ? THEN m.sending_time END) AS request_time,
+                   MIN(CASE WHEN m.msg_type = ? THEN m.sending_time END) AS response_time,
+                   SUM(m.msg_type = ?) AS responses
+            FROM message_keys k JOIN messages m ON m.id = k.message_id
+            WHERE k.tag = ?
+            GROUP BY k.value
+            HAVING request_time IS NOT NULL
+        """, self.connection, params=(request_type, response_type, response_type, int(key_tag)))
+        # SendingTime may come with or without a fraction (milli-, micro- or nanoseconds)
+        frame['request_time'] = parse_timestamps(frame['request_time'])
+        frame['response_time'] = parse_timestamps(frame['response_time'])
+        frame['latency_ms'] = (frame['response_time'] - frame['request_time']).dt.total_seconds() * 1000
+        return frame.sort_values('request_time').reset_index(drop=True)
+
+
+def format_message(log_time, fields):
+    return f'{log_time}: ' + '|'.join(f'{tag}={value}' for tag, value in fields.items())
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Build and query a FIX order/quote lifecycle index.')
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH, help='SQLite index file')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='Index log files, directories or glob patterns')
+    build.add_argument('inputs', nargs='+')
+
+    find = commands.add_parser('find', help='Print every message with tag=value')
+    find.add_argument('tag', type=int, choices=[int(tag) for tag in INDEX_TAGS])
+    find.add_argument('value')
+
+    lifecycle = commands.add_parser('lifecycle', help='Print every message of an order by ClOrdID')
+    lifecycle.add_argument('client_order_id')
+
+    latency = commands.add_parser('latency', help='Request -> first response latency from SendingTime (52)')
+    latency.add_argument('--request', default='R', help='Request MsgType (35)')
+    latency.add_argument('--response', default='S', help='Response MsgType (35)')
+    latency.add_argument('--key', type=int, default=131, choices=[int(tag) for tag in INDEX_TAGS], help='Tag linking request and response')
+    latency.add_argument('--output', help='Optional CSV file for the per-request latencies')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    index = FixIndex(args.index)
+    try:
+        if args.command == 'build':
+            for path in expand_inputs(args.inputs):
+                print(f'{path}: {index.add_file(path)} messages indexed')
+        elif args.command == 'find':
+            for log_time, fields in index.find(args.tag, args.value):
+                print(format_message(log_time, fields))
+        elif args.command == 'lifecycle':
+            for log_time, fields in index.order_lifecycle(args.client_order_id):
+                print(format_message(log_time, fields))
+        elif args.command == 'latency':
+            frame = index.latency(args.request, args.response, args.key)
+            answered = frame['latency_ms'].dropna()
+            print(f'{len(frame)} requests, {len(answered)} answered')
+            if len(answered):
+                print(answered.describe(percentiles=[0.5, 0.9, 0.99]).round(3).to_string())
+            if args.output:
+                frame.to_csv(args.output, index=False)
+                print(f'Latencies saved to {args.output}')
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Extract FIX tags from many log files on all cores.
+
+Inputs can be files, directories (every *.log inside) or glob patterns. Each file is cut into
+byte-range shards that are snapped to message boundaries, shards are parsed on a process pool,
+and results are written to the output in the original file/line order. Messages can be
+filtered by MsgType (35), SenderCompID/TargetCompID (49/56) and a SendingTime (52) window
+before any row is built.
+
+    python fix_ingest.py "logs/*.log" --tags 35,49,56,52,131,117,132 --output quotes.parquet --workers 8 --msg-type S
+    python fix_ingest.py logs/ --tags 35,11,37,39,14 --output orders.csv --by-session
+"""
+
+import argparse
+import glob
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from fix_parser import iter_messages
+from fix_sinks import DEFAULT_BATCH_SIZE, open_sink
+
+DEFAULT_SHARD_SIZE = 64 * 1024 * 1024
+# Anything but these in a CompID is replaced before it becomes part of a file name
+UNSAFE_PATH_CHARACTERS = re.compile(r'[^A-Za-z0-9._-]')
+
+
+def expand_inputs(inputs):
+    """Files, directories (all *.log inside) and glob patterns -> sorted, de-duplicated file list."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, '*.log'))))
+        elif any(character in item for character in '*?['):
+            paths.extend(sorted(glob.glob(item)))
+        else:
+            paths.append(item)
+    return list(dict.fromkeys(paths))
+
+
+def plan_shards(paths, shard_size=DEFAULT_SHARD_SIZE):
+    shards = []
+    for path in paths:
+        size = os.path.getsize(path)
+        for start in range(0, max(size, 1), shard_size):
+            shards.append((path, start, min(start + shard_size, size)))
+    return shards
+
+
+def sortable_timestamp(text):
+    # FIX UTCTimestamps (YYYYMMDD-HH:MM:SS with an optional .sss/.ssssss/.sssssssss) only sort as strings
+    # at one width, so every fraction is padded to nanoseconds: ...-12:00:00 -> ...-12:00:00.000000000
+    head, _, fraction = text.partition('.')
+    return f'{head}.{fraction[:9]:0<9}'
+
+
+def fix_timestamp(text):
+    # Filter bounds in the same fixed-width format as sortable_timestamp
+    timestamp = pd.Timestamp(text)
+    return timestamp.strftime('%Y%m%d-%H:%M:%S.') + f'{timestamp.microsecond * 1000 + timestamp.nanosecond:09d}'
+
+
+def message_filter(msg_types=None, senders=None, targets=None, since=None, until=None):
+    def keep(fields):
+        if msg_types and fields.get('35') not in msg_types:
+            return False
+        if senders and fields.get('49') not in senders:
+            return False
+        if targets and fields.get('56') not in targets:
+            return False
+        sending_time = fields.get('52')
+        if sending_time is not None and (since or until):
+            sending_time = sortable_timestamp(sending_time)
+        if since and (sending_time is None or sending_time < since):
+            return False
+        if until and (sending_time is None or sending_time >= until):
+            return False
+        return True
+    return keep
+
+
+def session_key(fields):
+    # Both directions of a session go to the same output
+    return '-'.join(sorted([fields.get('49') or 'UNKNOWN', fields.get('56') or 'UNKNOWN']))
+
+
+def extract_shard(path, start, end, tags, filters, by_session=False):
+    keep = message_filter(**filters)
+    tags = [str(tag) for tag in tags]
+    rows = []
+    for _, _, fields in iter_messages(path, start=start, end=end):
+        if keep(fields):
+            row = [fields.get(tag) for tag in tags]
+            rows.append((session_key(fields), row) if by_session else row)
+    return rows
+
+
+def ordered_results(shards, tags, filters, by_session, workers):
+    """Shard results in input order, with at most a few shards in flight per worker."""
+    if workers <= 1:
+        for path, start, end in shards:
+            yield extract_shard(path, start, end, tags, filters, by_session)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for path, start, end in shards:
+            pending.append(executor.submit(extract_shard, path, start, end, tags, filters, by_session))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def session_output_path(output_path, session):
+    # CompIDs come from the logs: no separators or other path syntax may reach the file name
+    stem, extension = os.path.splitext(output_path)
+    return f'{stem}_{UNSAFE_PATH_CHARACTERS.sub("_", session)}{extension}'
+
+
+def ingest(inputs, tags, output_path, workers=1, shard_size=DEFAULT_SHARD_SIZE, by_session=False,
+           batch_size=DEFAULT_BATCH_SIZE, **filters):
+    """Returns {output file: rows written}."""
+    shards = plan_shards(expand_inputs(inputs), shard_size)
+    sinks = {}
+    buffers = {}
+    counts = {}
+
+    def flush(path):
+        if buffers[path]:
+            sinks[path].write_batch(buffers[path])
+            counts[path] += len(buffers[path])
+            buffers[path] = []
+
+    def add(path, row):
+        if path not in sinks:
+            sinks[path] = open_sink(path, tags)
+            buffers[path] = []
+            counts[path] = 0
+        buffers[path].append(row)
+        if len(buffers[path]) >= batch_size:
+            flush(path)
+
+    if not by_session:
+        sinks[output_path] = open_sink(output_path, tags)
+        buffers[output_path] = []
+        counts[output_path] = 0
+
+    try:
+        for rows in ordered_results(shards, tags, filters, by_session, workers):
+            for row in rows:
+                if by_session:
+                    session, row = row
+                    add(session_output_path(output_path, session), row)
+                else:
+                    add(output_path, row)
+        for path in sinks:
+            flush(path)
+    except BaseException:
+        for sink in sinks.values():
+            sink.close(complete=False)
+        raise
+    for sink in sinks.values():
+        sink.close()
+    return counts
+
+
+def split_list(text):
+    return [item.strip() for item in text.split(',') if item.strip()] if text else None
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Extract FIX tags from many log files in parallel.')
+    parser.add_argument('inputs', nargs='+', help='Log files, directories or glob patterns')
+    parser.add_argument('--tags', required=True, help='Comma-separated FIX tag numbers, e.g. 35,49,56,52')
+    parser.add_argument('--output', default='extracted_data.csv', help='Output file (.csv, .parquet, .arrow or .xlsx)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of parser processes')
+    parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help='Bytes per shard when splitting big files')
+    parser.add_argument('--by-session', action='store_true', help='Write one output file per SenderCompID/TargetCompID session')
+    parser.add_argument('--msg-type', help='Only these MsgTypes (35), comma-separated, e.g. D,8')
+    parser.add_argument('--sender', help='Only these SenderCompIDs (49), comma-separated')
+    parser.add_argument('--target', help='Only these TargetCompIDs (56), comma-separated')
+    parser.add_argument('--since', help='Only messages with SendingTime (52) at or after this time')
+    parser.add_argument('--until', help='Only messages with SendingTime (52) before this time')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    tags = [int(tag) for tag in split_list(args.tags)]
+    counts = ingest(
+        args.inputs, tags, args.output, workers=args.workers, shard_size=args.shard_size, by_session=args.by_session,
+        msg_types=split_list(args.msg_type), senders=split_list(args.sender), targets=split_list(args.target),
+        since=fix_timestamp(args.since) if args.since else None, until=fix_timestamp(args.until) if args.until else None,
+    )
+    if not counts:
+        print('No messages matched.')
+    for path, row_count in counts.items():
+        print(f'{row_count} messages written to {path}')
+
+
+if __name__ == "__main__":
+    main()
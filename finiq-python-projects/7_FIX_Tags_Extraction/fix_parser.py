@@ -0,0 +1,82 @@
+"""
+Streaming parser for FIX message logs.
+
+Each log line looks like '<log time>: 8=FIX.4.4<SOH>9=92<SOH>35=A<SOH>...10=069<SOH>'. The file
+is read in large binary chunks and every message is split once on its delimiter (SOH, or '|'
+for pretty-printed logs) into a tag -> value dict, so memory stays constant however big the
+log is and the cost per line does not grow with the number of tags requested.
+"""
+
+SOH = '\x01'
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024
+
+
+def iter_lines(file_path, chunk_size=DEFAULT_CHUNK_SIZE, start=0, end=None):
+    """
+    Yield (byte offset, line bytes) for every non-empty line of the file.
+
+    start/end restrict the scan to the lines that begin inside [start, end), so a big file can
+    be split at arbitrary byte positions and every message is still read by exactly one shard.
+    """
+    with open(file_path, 'rb') as file:
+        if start > 0:
+            file.seek(start - 1)
+            # A line already in progress at start belongs to the previous shard
+            if file.read(1) != b'\n':
+                file.readline()
+        offset = file.tell()
+        pending = b''
+        while end is None or offset < end:
+            chunk = file.read(chunk_size)
+            if not chunk:
+                break
+            chunk = pending + chunk
+            lines = chunk.split(b'\n')
+            # The last piece may be a partial line; carry it into the next chunk
+            pending = lines.pop()
+            for line in lines:
+                if end is not None and offset >= end:
+                    return
+                if line.strip():
+                    yield offset, line
+                offset += len(line) + 1
+        if pending.strip() and (end is None or offset < end):
+            yield offset, pending
+
+
+def parse_message(line):
+    """Split one log line into (log time, {tag: value}). Tags are kept as strings, e.g. '35'."""
+    if isinstance(line, bytes):
+        line = line.decode('latin-1')
+    line = line.rstrip('\r\n')
+
+    start = line.find('8=FIX')
+    if start == -1:
+        return None, {}
+    log_time = line[:start].rstrip(': ') or None
+
+    body = line[start:]
+    delimiter = SOH if SOH in body else '|'
+    pairs = [field.split('=', 1) for field in body.split(delimiter) if '=' in field]
+    fields = dict(pairs)
+    if len(fields) < len(pairs):
+        # Repeating groups reuse tags; keep the first occurrence
+        fields = {}
+        for tag, value in pairs:
+            fields.setdefault(tag, value)
+    return log_time, fields
+
+
+def iter_messages(file_path, chunk_size=DEFAULT_CHUNK_SIZE, start=0, end=None):
+    """Yield (byte offset, log time, fields) for every FIX message in the log (or in [start, end))."""
+    for offset, line in iter_lines(file_path, chunk_size, start, end):
+        log_time, fields = parse_message(line)
+        if fields:
+            yield offset, log_time, fields
+
+
+def iter_rows(file_path, tags, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield one list of values per message for the requested tags (None where a tag is absent)."""
+    tags = [str(tag) for tag in tags]
+    for _, _, fields in iter_messages(file_path, chunk_size):
+        yield [fields.get(tag) for tag in tags]
@@ -0,0 +1,195 @@
+"""
+Batched, typed output sinks for extracted FIX rows.
+
+Rows (one list of tag values per message) are converted a batch at a time into typed
+columns and appended to the output, so memory stays flat regardless of log size:
+
+- integer tags (sequence numbers, counts) -> nullable int64
+- price and quantity tags -> float64 (FIX Qty fields may be fractional)
+- SendingTime/TransactTime style tags -> timestamps
+- everything else -> string
+
+CSV needs nothing extra; Parquet and Arrow IPC need pyarrow. Excel is still available for
+small extracts but is capped at 1,048,576 rows by the format itself.
+"""
+
+import itertools
+import os
+
+import pandas as pd
+
+INT_TAGS = {9, 34, 108, 146, 6001}
+# Prices, plus the Qty fields OrderQty(38), CumQty(14), LastQty(32) and LeavesQty(151)
+FLOAT_TAGS = {6, 14, 31, 32, 38, 44, 132, 133, 151, 188, 190, 194}
+TIMESTAMP_TAGS = {52, 60, 122}
+TIMESTAMP_FORMATS = ['%Y%m%d-%H:%M:%S.%f', '%Y%m%d-%H:%M:%S']
+EXCEL_MAX_ROWS = 1_048_575
+DEFAULT_BATCH_SIZE = 100_000
+
+
+def column_type(tag):
+    tag = int(tag)
+    if tag in INT_TAGS:
+        return 'int'
+    if tag in FLOAT_TAGS:
+        return 'float'
+    if tag in TIMESTAMP_TAGS:
+        return 'timestamp'
+    return 'string'
+
+
+def parse_timestamps(values):
+    parsed = pd.to_datetime(values, format=TIMESTAMP_FORMATS[0], errors='coerce')
+    for timestamp_format in TIMESTAMP_FORMATS[1:]:
+        missing = parsed.isna() & values.notna()
+        if missing.any():
+            parsed[missing] = pd.to_datetime(values[missing], format=timestamp_format, errors='coerce')
+    return parsed
+
+
+def to_frame(rows, tags):
+    """Typed DataFrame (one column per tag, named by tag number) from a batch of rows."""
+    columns = [str(tag) for tag in tags]
+    frame = pd.DataFrame(rows, columns=columns, dtype=object)
+    for column in columns:
+        kind = column_type(column)
+        if kind == 'int':
+            numbers = pd.to_numeric(frame[column], errors='coerce')
+            # A fractional value in an integer tag is malformed: leave it empty rather than fail the batch
+            frame[column] = numbers.where(numbers % 1 == 0).astype('Int64')
+        elif kind == 'float':
+            frame[column] = pd.to_numeric(frame[column], errors='coerce').astype('float64')
+        elif kind == 'timestamp':
+            frame[column] = parse_timestamps(frame[column]).astype('datetime64[ms]')
+        else:
+            frame[column] = frame[column].astype('string')
+    return frame
+
+
+def arrow_schema(tags):
+    import pyarrow as pa
+
+    arrow_types = {'int': pa.int64(), 'float': pa.float64(), 'timestamp': pa.timestamp('ms'), 'string': pa.string()}
+    return pa.schema([(str(tag), arrow_types[column_type(tag)]) for tag in tags])
+
+
+class CsvSink:
+    def __init__(self, path, tags):
+        self.path = path
+        self.tags = tags
+        self.file = open(path, 'w', newline='')
+        self.header_written = False
+
+    def write_batch(self, rows):
+        to_frame(rows, self.tags).to_csv(self.file, index=False, header=not self.header_written,
+                                         date_format='%Y-%m-%d %H:%M:%S.%f')
+        self.header_written = True
+
+    def close(self, complete=True):
+        if complete and not self.header_written:
+            self.write_batch([])
+        self.file.close()
+
+
+class ParquetSink:
+    def __init__(self, path, tags):
+        import pyarrow.parquet as pq
+
+        self.tags = tags
+        self.schema = arrow_schema(tags)
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write_batch(self, rows):
+        import pyarrow as pa
+
+        self.writer.write_table(pa.Table.from_pandas(to_frame(rows, self.tags), schema=self.schema, preserve_index=False))
+
+    def close(self, complete=True):
+        self.writer.close()
+
+
+class ArrowSink:
+    def __init__(self, path, tags):
+        import pyarrow as pa
+
+        self.tags = tags
+        self.schema = arrow_schema(tags)
+        self.sink = pa.OSFile(path, 'wb')
+        self.writer = pa.ipc.new_file(self.sink, self.schema)
+
+    def write_batch(self, rows):
+        import pyarrow as pa
+
+        self.writer.write_table(pa.Table.from_pandas(to_frame(rows, self.tags), schema=self.schema, preserve_index=False))
+
+    def close(self, complete=True):
+        self.writer.close()
+        self.sink.close()
+
+
+class ExcelSink:
+    # openpyxl cannot append, so batches are held until close
+    def __init__(self, path, tags):
+        self.path = path
+        self.tags = tags
+        self.frames = []
+        self.row_count = 0
+        self.overflowed = False
+
+    def write_batch(self, rows):
+        self.row_count += len(rows)
+        if self.row_count > EXCEL_MAX_ROWS:
+            self.overflowed = True
+            raise ValueError(f'{self.row_count} rows do not fit in an Excel sheet; use .csv, .parquet or .arrow output')
+        self.frames.append(to_frame(rows, self.tags))
+
+    def close(self, complete=True):
+        # A truncated extract is worse than none: write nothing after an overflow or a failed run
+        if self.overflowed or not complete:
+            return
+        frame = pd.concat(self.frames) if self.frames else to_frame([], self.tags)
+        # Write next to the target and rename, so a failed write never leaves a half-written .xlsx
+        temp_path = f'{self.path}.{os.getpid()}.tmp.xlsx'
+        try:
+            frame.to_excel(temp_path, index=False)
+            os.replace(temp_path, self.path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+SINKS = {
+    '.csv': CsvSink,
+    '.parquet': ParquetSink,
+    '.arrow': ArrowSink,
+    '.feather': ArrowSink,
+    '.ipc': ArrowSink,
+    '.xlsx': ExcelSink,
+}
+
+
+def open_sink(path, tags):
+    """Pick the sink from the output file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f'Unsupported output format {extension!r}; choose one of {", ".join(SINKS)}')
+    return SINKS[extension](path, tags)
+
+
+def write_rows(rows, path, tags, batch_size=DEFAULT_BATCH_SIZE):
+    """Write an iterable of rows to path in batches; returns the number of rows written."""
+    sink = open_sink(path, tags)
+    rows = iter(rows)
+    row_count = 0
+    try:
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            sink.write_batch(batch)
+            row_count += len(batch)
+    except BaseException:
+        sink.close(complete=False)
+        raise
+    sink.close()
+    return row_count
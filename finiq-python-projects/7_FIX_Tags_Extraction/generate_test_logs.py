@@ -0,0 +1,149 @@
+"""
+Generate a synthetic FIX log corpus for testing the ingestion and index tools offline.
+
+One log file per session per day, in the same '<log time>: 8=FIX.4.4<SOH>...' layout as
+FIX_Messages.log. Each session mixes:
+- quote requests (35=R, 131) answered by streams of quotes (35=S, 117/131/132/133)
+- new orders (35=D, 11) answered by execution reports (35=8, 11/37/17/39/150/14/151/31/32)
+- some cancels (35=F, 11/41) answered by a cancel report
+- heartbeats (35=0)
+
+    python generate_test_logs.py Test/Corpus --sessions 4 --days 3 --messages 50000
+"""
+
+import argparse
+import itertools
+import os
+import random
+from datetime import datetime, timedelta
+
+SOH = '\x01'
+PAIRS = {'USD/INR': 82.58, 'EUR/USD': 1.0785, 'USD/JPY': 139.45, 'GBP/USD': 1.2590}
+
+
+def fix_time(moment):
+    return moment.strftime('%Y%m%d-%H:%M:%S.%f')[:-3]
+
+
+def build_message(fields):
+    body = SOH.join(f'{tag}={value}' for tag, value in fields) + SOH
+    header = f'8=FIX.4.4{SOH}9={len(body)}{SOH}'
+    checksum = sum((header + body).encode('latin-1')) % 256
+    return f'{header}{body}10={checksum:03d}{SOH}'
+
+
+class Session:
+    def __init__(self, sender, target, rng, id_counter):
+        self.sender = sender
+        self.target = target
+        self.rng = rng
+        self.sequence = {sender: 0, target: 0}
+        # Shared across sessions so order and quote ids are unique in the whole corpus
+        self.id_counter = id_counter
+
+    def new_id(self):
+        return next(self.id_counter)
+
+    def message(self, moment, direction_sender, msg_type, fields):
+        direction_target = self.target if direction_sender == self.sender else self.sender
+        self.sequence[direction_sender] += 1
+        header = [(35, msg_type), (34, self.sequence[direction_sender]), (49, direction_sender),
+                  (52, fix_time(moment)), (56, direction_target)]
+        return f'{fix_time(moment)}: {build_message(header + fields)}'
+
+    def quote_flow(self, moment):
+        pair = self.rng.choice(list(PAIRS))
+        mid = PAIRS[pair] * (1 + self.rng.gauss(0, 0.001))
+        quantity = self.rng.choice([10000, 20000, 50000, 100000])
+        request_id = self.new_id()
+        lines = [self.message(moment, self.sender, 'R', [(131, request_id), (146, 1), (55, pair), (107, 'SPOT'),
+                                                         (54, 1), (38, quantity), (15, pair[:3])])]
+        for quote_number in range(self.rng.randint(1, 10)):
+            moment += timedelta(milliseconds=self.rng.randint(20, 150))
+            spread = mid * 0.00005
+            lines.append(self.message(moment, self.target, 'S', [
+                (55, pair), (38, quantity), (117, f'{self.target}_{request_id}_{quote_number + 1}'), (131, request_id),
+                (132, f'{mid - spread:.5f}'), (133, f'{mid + spread:.5f}'), (60, fix_time(moment))]))
+        return moment, lines
+
+    def order_flow(self, moment):
+        pair = self.rng.choice(list(PAIRS))
+        price = PAIRS[pair] * (1 + self.rng.gauss(0, 0.001))
+        quantity = self.rng.choice([10000, 20000, 50000, 100000])
+        client_order_id = f'ORD{self.new_id()}'
+        order_id = f'X{self.new_id()}'
+        lines = [self.message(moment, self.sender, 'D', [(11, client_order_id), (55, pair), (54, self.rng.choice([1, 2])),
+                                                         (38, quantity), (40, 2), (44, f'{price:.5f}'), (60, fix_time(moment))])]
+        moment += timedelta(milliseconds=self.rng.randint(1, 50))
+        lines.append(self.message(moment, self.target, '8', [(11, client_order_id), (37, order_id), (17, f'E{self.new_id()}'),
+                                                              (39, 0), (150, 0), (55, pair), (38, quantity), (14, 0), (151, quantity)]))
+
+        if self.rng.random() < 0.2:
+            moment += timedelta(milliseconds=self.rng.randint(50, 500))
+            cancel_id = f'ORD{self.new_id()}'
+            lines.append(self.message(moment, self.sender, 'F', [(11, cancel_id), (41, client_order_id), (37, order_id), (55, pair)]))
+            moment += timedelta(milliseconds=self.rng.randint(1, 50))
+            lines.append(self.message(moment, self.target, '8', [(11, cancel_id), (41, client_order_id), (37, order_id),
+                                                                  (17, f'E{self.new_id()}'), (39, 4), (150, 4), (55, pair)]))
+            return moment, lines
+
+        filled = 0
+        while filled < quantity:
+            moment += timedelta(milliseconds=self.rng.randint(1, 200))
+            last_quantity = min(quantity - filled, self.rng.choice([5000, 10000, quantity]))
+            filled += last_quantity
+            status = 2 if filled == quantity else 1
+            lines.append(self.message(moment, self.target, '8', [
+                (11, client_order_id), (37, order_id), (17, f'E{self.new_id()}'), (39, status), (150, 'F'), (55, pair),
+                (38, quantity), (32, last_quantity), (31, f'{price:.5f}'), (14, filled), (151, quantity - filled),
+                (6, f'{price:.5f}'), (60, fix_time(moment))]))
+        return moment, lines
+
+    def day(self, date, num_messages):
+        moment = datetime(date.year, date.month, date.day, 8, 0, 0)
+        lines = [self.message(moment, self.sender, 'A', [(98, 0), (108, 30)]),
+                 self.message(moment, self.target, 'A', [(98, 0), (108, 30)])]
+        while len(lines) < num_messages:
+            moment += timedelta(milliseconds=self.rng.randint(10, 2000))
+            choice = self.rng.random()
+            if choice < 0.5:
+                moment, new_lines = self.quote_flow(moment)
+            elif choice < 0.95:
+                moment, new_lines = self.order_flow(moment)
+            else:
+                new_lines = [self.message(moment, self.rng.choice([self.sender, self.target]), '0', [])]
+            lines.extend(new_lines)
+        return lines
+
+
+def generate(output_dir, num_sessions=2, num_days=2, messages_per_day=1000, seed=0):
+    os.makedirs(output_dir, exist_ok=True)
+    rng = random.Random(seed)
+    id_counter = itertools.count(10001)
+    first_day = datetime(2023, 6, 5)
+    paths = []
+    for session_number in range(1, num_sessions + 1):
+        session = Session(f'CLIENT_{session_number}', 'FIX_ACCEPTOR', rng, id_counter)
+        for day_number in range(num_days):
+            date = first_day + timedelta(days=day_number)
+            path = os.path.join(output_dir, f'{session.sender}_{date:%Y%m%d}.log')
+            with open(path, 'w', newline='\n') as file:
+                file.write('\n'.join(session.day(date, messages_per_day)) + '\n')
+            paths.append(path)
+    return paths
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Generate synthetic FIX logs.')
+    parser.add_argument('output_dir', help='Directory the log files are written to')
+    parser.add_argument('--sessions', type=int, default=2, help='Number of FIX sessions')
+    parser.add_argument('--days', type=int, default=2, help='Number of daily files per session')
+    parser.add_argument('--messages', type=int, default=1000, help='Approximate messages per file')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    for path in generate(args.output_dir, args.sessions, args.days, args.messages, args.seed):
+        print(f'Written {path}')
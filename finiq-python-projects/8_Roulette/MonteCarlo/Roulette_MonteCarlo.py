@@ -0,0 +1,188 @@
+"""
+Monte Carlo simulator for roulette betting systems
+
+keep betting on Red with one of the strategies in roulette_strategies.py (Martingale by default:
+start at the base bet, double it after every loss, go back to the base bet after a win)
+simulate M independent sessions of N rounds each as NumPy arrays instead of one round at a time
+every session starts with the same bankroll; bets are capped at the table maximum, and a session is
+ruined when the next bet can't be covered (or the bankroll drops below the table minimum) and stops there
+
+print the probability of ruin, expected P&L (with standard error), the distribution of P&L and max drawdown
+and the longest losing streak seen
+sessions are generated in chunks so memory stays bounded, every chunk has its own seed derived from --seed
+so results are identical for any number of --workers
+with --output, nothing is written per round: per-session aggregates go to compressed columnar chunks,
+percentiles and streak lengths to summary.json, and only --trace-sessions sampled sessions keep full traces
+(see roulette_output.py)
+
+    python Roulette_MonteCarlo.py --sessions 1000000 --rounds 1000 --workers 8
+    python Roulette_MonteCarlo.py --strategy fibonacci --wheel american --bankroll 5000 --table-max 500
+    python Roulette_MonteCarlo.py --sessions 100000 --rounds 1000 --output runs/martingale --trace-sessions 20
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from roulette_output import LogHistogram, add_counts, write_chunk, write_summary
+from roulette_strategies import STRATEGIES, WHEEL_POCKETS, simulate_sessions
+
+PERCENTILE_LEVELS = (1, 5, 25, 50, 75, 95, 99)
+
+def simulate_chunk(seed, chunk_number, first_session, num_sessions, num_rounds, game, trace_sessions=0, output_dir=None):
+    rng = np.random.default_rng(seed)
+    strategy = STRATEGIES[game['strategy']]()
+    result = simulate_sessions(rng, num_sessions, num_rounds, game['wheel'], strategy, game['base_bet'],
+                               game['bankroll'], game['table_min'], game['table_max'], trace_sessions)
+
+    # Per-session rows and traces go straight to disk; only aggregates and sketches are sent back
+    if output_dir:
+        write_chunk(output_dir, 'sessions', chunk_number, {
+            'session': first_session + np.arange(num_sessions),
+            'final_pnl': result['final_pnl'],
+            'max_drawdown': result['max_drawdown'],
+            'wagered': result['wagered'],
+            # 1-based round the session could no longer bet in, 0 if it was never ruined
+            'ruin_round': np.where(result['ruined'], result['ruin_round'] + 1, 0),
+            'longest_losing_streak': result['longest_losing_streak'],
+        })
+        if trace_sessions:
+            trace = dict(result['trace'], session=first_session + result['trace']['session'])
+            write_chunk(output_dir, 'traces', chunk_number, trace)
+
+    pnl_sketch = LogHistogram()
+    pnl_sketch.add(result['final_pnl'])
+    drawdown_sketch = LogHistogram()
+    drawdown_sketch.add(result['max_drawdown'])
+
+    return {
+        'sessions': num_sessions,
+        'pnl_sum': result['final_pnl'].sum(),
+        'pnl_sum_squares': np.square(result['final_pnl']).sum(),
+        'wagered_sum': result['wagered'].sum(),
+        'ruined': int(result['ruined'].sum()),
+        'ruin_round_sum': int(result['ruin_round'][result['ruined']].sum()),
+        'streak_counts': result['streak_counts'],
+        'longest_streak_counts': np.bincount(result['longest_losing_streak']),
+        'pnl_sketch': pnl_sketch,
+        'drawdown_sketch': drawdown_sketch,
+    }
+
+def run_simulation(num_sessions, num_rounds, game, seed=None, chunk_size=50_000, workers=1, trace_sessions=0, output_dir=None):
+    chunk_sizes = [chunk_size] * (num_sessions // chunk_size)
+    if num_sessions % chunk_size:
+        chunk_sizes.append(num_sessions % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    first_sessions = np.cumsum([0] + chunk_sizes[:-1]).tolist()
+    # Traced sessions are spread over the chunks in proportion to their size, trace_sessions in total
+    trace_sessions = min(trace_sessions, num_sessions)
+    trace_bounds = [trace_sessions * (first_session + size) // num_sessions
+                    for first_session, size in zip(first_sessions, chunk_sizes)]
+    chunk_traces = np.diff([0] + trace_bounds).tolist()
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    jobs = [(chunk_seed, chunk_number, first_session, size, num_rounds, game, traces, output_dir)
+            for chunk_number, (chunk_seed, first_session, size, traces)
+            in enumerate(zip(seeds, first_sessions, chunk_sizes, chunk_traces))]
+
+    # Chunks are folded into the running summary as they finish, so memory doesn't grow with the run
+    summary = None
+    if workers <= 1:
+        for job in jobs:
+            summary = merge_chunk(summary, simulate_chunk(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk in executor.map(simulate_chunk, *zip(*jobs)):
+                summary = merge_chunk(summary, chunk)
+
+    return summarize(summary)
+
+def merge_chunk(summary, chunk):
+    if summary is None:
+        return chunk
+    for key in ('sessions', 'pnl_sum', 'pnl_sum_squares', 'wagered_sum', 'ruined', 'ruin_round_sum'):
+        summary[key] += chunk[key]
+    for key in ('streak_counts', 'longest_streak_counts'):
+        summary[key] = add_counts(summary[key], chunk[key])
+    summary['pnl_sketch'].merge(chunk['pnl_sketch'])
+    summary['drawdown_sketch'].merge(chunk['drawdown_sketch'])
+    return summary
+
+def summarize(merged):
+    total_sessions = merged['sessions']
+    mean = merged['pnl_sum'] / total_sessions
+    std = np.sqrt(max(merged['pnl_sum_squares'] / total_sessions - mean ** 2, 0.0))
+    ruined = merged['ruined']
+
+    return {
+        'sessions': total_sessions,
+        'expected_pnl': mean,
+        'std_pnl': std,
+        'standard_error': std / np.sqrt(total_sessions),
+        'expected_wagered': merged['wagered_sum'] / total_sessions,
+        'prob_ruin': ruined / total_sessions,
+        'mean_ruin_round': merged['ruin_round_sum'] / ruined + 1 if ruined else None,
+        'longest_losing_streak': len(merged['longest_streak_counts']) - 1,
+        'pnl_percentiles': {level: merged['pnl_sketch'].quantile(level / 100) for level in PERCENTILE_LEVELS},
+        'drawdown_percentiles': {level: merged['drawdown_sketch'].quantile(level / 100) for level in PERCENTILE_LEVELS},
+        'streak_counts': merged['streak_counts'],
+        'longest_streak_counts': merged['longest_streak_counts'],
+        'pnl_sketch': merged['pnl_sketch'],
+        'drawdown_sketch': merged['drawdown_sketch'],
+    }
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Vectorized Monte Carlo simulation of roulette betting systems on Red.')
+    parser.add_argument('--sessions', type=int, default=100_000, help='Number of independent sessions')
+    parser.add_argument('--rounds', type=int, default=1000, help='Rounds per session')
+    parser.add_argument('--strategy', choices=list(STRATEGIES), default='martingale', help='Betting system')
+    parser.add_argument('--base-bet', type=float, default=10.0, help='One betting unit (the first bet of a session)')
+    parser.add_argument('--bankroll', type=float, default=1000.0, help='Money available to each session')
+    parser.add_argument('--table-min', type=float, help='Table minimum bet')
+    parser.add_argument('--table-max', type=float, help='Table maximum bet; bigger bets are capped')
+    parser.add_argument('--wheel', choices=list(WHEEL_POCKETS), default='european', help='Single zero (37 pockets) or double zero (38)')
+    parser.add_argument('--chunk-size', type=int, default=50_000, help='Sessions simulated per chunk')
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes')
+    parser.add_argument('--seed', type=int, help='Random seed')
+    parser.add_argument('--output', help='Directory for per-session chunks, traces and summary.json')
+    parser.add_argument('--trace-sessions', type=int, default=0, help='Sessions recorded round by round (needs --output)')
+    return parser.parse_args()
+
+def main():
+    args = parse_arguments()
+    if args.table_min is not None and args.base_bet < args.table_min:
+        sys.exit('--base-bet is below the table minimum')
+    game = {'wheel': args.wheel, 'strategy': args.strategy, 'base_bet': args.base_bet, 'bankroll': args.bankroll,
+            'table_min': args.table_min, 'table_max': args.table_max}
+
+    if args.trace_sessions and not args.output:
+        sys.exit('--trace-sessions needs --output')
+
+    result = run_simulation(args.sessions, args.rounds, game, seed=args.seed, chunk_size=args.chunk_size, workers=args.workers,
+                            trace_sessions=args.trace_sessions, output_dir=args.output)
+
+    print(f'Sessions: {result["sessions"]} x {args.rounds} rounds ({args.strategy}, {args.wheel} wheel, '
+          f'base bet {args.base_bet:.2f}, bankroll {args.bankroll:.2f})')
+    print(f'Probability of Ruin: {result["prob_ruin"]*100:.2f}%')
+    if result['mean_ruin_round'] is not None:
+        print(f'Average Round of Ruin: {result["mean_ruin_round"]:.1f}')
+    print(f'Expected P&L: {result["expected_pnl"]:.2f} (std error {result["standard_error"]:.2f})')
+    print(f'P&L Std Dev: {result["std_pnl"]:.2f}')
+    print('P&L:')
+    for level, value in result['pnl_percentiles'].items():
+        print(f'  {level:>2}th percentile: {value:.2f}')
+    print('Max Drawdown:')
+    for level, value in result['drawdown_percentiles'].items():
+        print(f'  {level:>2}th percentile: {value:.2f}')
+    print(f'Longest Losing Streak: {result["longest_losing_streak"]}')
+
+    if args.output:
+        path = write_summary(args.output, dict(vars(args), **result))
+        print(f'Summary saved to {path}')
+
+if __name__ == "__main__":
+    main()
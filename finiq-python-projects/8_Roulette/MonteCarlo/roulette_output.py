@@ -0,0 +1,141 @@
+"""
+Summary-first output for the roulette Monte Carlo simulator.
+
+Nothing is written per round. A run produces:
+- sessions_NNNNN.npz: one row per session (final P&L, max drawdown, ruin round, longest losing streak,
+  amount wagered), one compressed columnar file per chunk
+- traces_NNNNN.npz: optional full round-by-round traces of a few sampled sessions, same layout
+- summary.json: run parameters, headline numbers, the losing-streak length histogram and
+  log-bucketed histogram sketches of P&L and max drawdown that percentiles are read from
+
+Sketches and streak counts are merged chunk by chunk, so memory and disk stay bounded however many
+rounds are simulated.
+"""
+
+import glob
+import json
+import os
+
+import numpy as np
+
+SKETCH_RELATIVE_ERROR = 0.01
+SKETCH_MIN_VALUE = 0.01
+
+
+class LogHistogram:
+    """
+    Mergeable histogram with logarithmic buckets: every quantile is within about 1% of the true value.
+
+    Positive and negative values are bucketed by their magnitude; anything smaller than
+    SKETCH_MIN_VALUE counts as zero.
+    """
+
+    def __init__(self, relative_error=SKETCH_RELATIVE_ERROR):
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+
+    def _add_counts(self, counts, values):
+        buckets, bucket_counts = np.unique(np.ceil(np.log(values) / np.log(self.gamma)).astype(np.int64), return_counts=True)
+        for bucket, count in zip(buckets.tolist(), bucket_counts.tolist()):
+            counts[bucket] = counts.get(bucket, 0) + count
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self._add_counts(self.positive, values[values > SKETCH_MIN_VALUE])
+        self._add_counts(self.negative, -values[values < -SKETCH_MIN_VALUE])
+        self.zero += int(np.count_nonzero(np.abs(values) <= SKETCH_MIN_VALUE))
+
+    def merge(self, other):
+        for counts, other_counts in ((self.positive, other.positive), (self.negative, other.negative)):
+            for bucket, count in other_counts.items():
+                counts[bucket] = counts.get(bucket, 0) + count
+        self.zero += other.zero
+
+    def count(self):
+        return sum(self.positive.values()) + sum(self.negative.values()) + self.zero
+
+    def _bucket_value(self, bucket):
+        return 2 * self.gamma ** bucket / (self.gamma + 1)
+
+    def quantile(self, level):
+        """Value at quantile level (0-1)."""
+        rank = level * (self.count() - 1)
+        seen = 0
+        # Most negative first, then zero, then positives in increasing order
+        for bucket in sorted(self.negative, reverse=True):
+            seen += self.negative[bucket]
+            if seen > rank:
+                return -self._bucket_value(bucket)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for bucket in sorted(self.positive):
+            seen += self.positive[bucket]
+            if seen > rank:
+                return self._bucket_value(bucket)
+        return np.nan
+
+    def to_dict(self):
+        return {
+            'gamma': self.gamma,
+            'zero': self.zero,
+            'positive': {str(bucket): count for bucket, count in sorted(self.positive.items())},
+            'negative': {str(bucket): count for bucket, count in sorted(self.negative.items())},
+        }
+
+
+def add_counts(total, counts):
+    """Element-wise sum of two count arrays of different lengths."""
+    if len(counts) > len(total):
+        total, counts = counts, total
+    total = total.copy()
+    total[:len(counts)] += counts
+    return total
+
+
+def chunk_path(output_dir, kind, chunk_number):
+    return os.path.join(output_dir, f'{kind}_{chunk_number:05d}.npz')
+
+
+def write_chunk(output_dir, kind, chunk_number, columns):
+    # Written under a temporary name first so a killed run never leaves a truncated chunk behind
+    path = chunk_path(output_dir, kind, chunk_number)
+    temporary_path = path + '.tmp.npz'
+    np.savez_compressed(temporary_path, **columns)
+    os.replace(temporary_path, path)
+    return path
+
+
+def read_chunks(output_dir, kind='sessions'):
+    """Concatenate every sessions_*.npz (or traces_*.npz) chunk of a run into one dict of columns."""
+    columns = {}
+    for path in sorted(glob.glob(os.path.join(output_dir, f'{kind}_[0-9]*.npz'))):
+        with np.load(path) as chunk:
+            for name in chunk.files:
+                columns.setdefault(name, []).append(chunk[name])
+    return {name: np.concatenate(parts) for name, parts in columns.items()}
+
+
+def write_summary(output_dir, summary):
+    def plain(value):
+        # NaN/inf (e.g. a percentile of sessions that all bust early) are written as null, which is valid JSON
+        if isinstance(value, LogHistogram):
+            return plain(value.to_dict())
+        if isinstance(value, dict):
+            return {key: plain(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return [plain(item) for item in value]
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, float) and not np.isfinite(value):
+            return None
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        raise TypeError(f'Cannot write {type(value).__name__} to the summary')
+
+    path = os.path.join(output_dir, 'summary.json')
+    with open(path, 'w') as file:
+        json.dump(plain(summary), file, indent=2, allow_nan=False)
+    return path
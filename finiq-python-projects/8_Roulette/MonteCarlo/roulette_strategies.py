@@ -0,0 +1,178 @@
+"""
+Betting strategies and wheel models for the roulette Monte Carlo simulator.
+
+Every strategy is compiled to a small state machine: a bet size (in base-bet units) per state and
+the next state after a win and after a loss. simulate_sessions runs any such table through one
+vectorized kernel, one round at a time across all sessions, with a bankroll and table limits.
+
+- martingale: double after a loss, back to one unit after a win
+- reverse_martingale (Paroli): double after a win, bank the profit after a run of wins or a loss
+- dalembert: one unit more after a loss, one unit less after a win
+- fibonacci: one step up the Fibonacci sequence after a loss, two steps back after a win
+- flat: always one unit
+"""
+
+import numpy as np
+
+from roulette_output import add_counts
+
+ROUND_BLOCK = 128
+
+# Red numbers on a real wheel; 0 (and 00 on an American wheel, numbered 37 here) are green
+RED_NUMBERS = [1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36]
+WHEEL_POCKETS = {'european': 37, 'american': 38}
+
+
+def red_table(wheel):
+    table = np.zeros(WHEEL_POCKETS[wheel], dtype=bool)
+    table[RED_NUMBERS] = True
+    return table
+
+
+class Strategy:
+    def __init__(self, name, bet_units, on_win, on_loss):
+        self.name = name
+        self.bet_units = np.asarray(bet_units, dtype=np.float64)
+        self.on_win = np.asarray(on_win, dtype=np.int32)
+        self.on_loss = np.asarray(on_loss, dtype=np.int32)
+
+
+def martingale(max_steps=64):
+    # State = losses since the last win
+    steps = np.arange(max_steps)
+    return Strategy('martingale', np.ldexp(1.0, steps), np.zeros(max_steps), np.minimum(steps + 1, max_steps - 1))
+
+
+def reverse_martingale(target_wins=3):
+    # State = wins since the last loss; after target_wins in a row the run is banked and betting restarts
+    steps = np.arange(target_wins)
+    return Strategy('reverse_martingale', np.ldexp(1.0, steps), (steps + 1) % target_wins, np.zeros(target_wins))
+
+
+def dalembert(max_units=10_000):
+    # State = bet size in units - 1
+    units = np.arange(max_units)
+    return Strategy('dalembert', units + 1, np.maximum(units - 1, 0), np.minimum(units + 1, max_units - 1))
+
+
+def fibonacci(max_steps=80):
+    # State = position in 1, 1, 2, 3, 5, ...
+    sequence = np.ones(max_steps)
+    for step in range(2, max_steps):
+        sequence[step] = sequence[step - 1] + sequence[step - 2]
+    steps = np.arange(max_steps)
+    return Strategy('fibonacci', sequence, np.maximum(steps - 2, 0), np.minimum(steps + 1, max_steps - 1))
+
+
+def flat():
+    return Strategy('flat', [1.0], [0], [0])
+
+
+STRATEGIES = {
+    'martingale': martingale,
+    'reverse_martingale': reverse_martingale,
+    'dalembert': dalembert,
+    'fibonacci': fibonacci,
+    'flat': flat,
+}
+
+
+def simulate_sessions(rng, num_sessions, num_rounds, wheel, strategy, base_bet, bankroll, table_min=None, table_max=None,
+                      trace_sessions=0):
+    """
+    Even-money bets on Red for a batch of sessions, following the strategy's state machine.
+
+    Bets are base_bet * units, capped at table_max. A session is ruined (and stops) when its next bet
+    can't be covered or its bankroll drops below table_min. Spins are drawn a block of rounds at a time
+    for the sessions still alive, and ruined sessions are dropped between blocks.
+
+    Besides per-session results, every losing streak is counted by length ('streak_counts'), and the
+    first trace_sessions sessions are recorded round by round ('trace').
+    """
+    red = red_table(wheel)
+    bets_by_state = base_bet * strategy.bet_units
+    if table_max is not None:
+        bets_by_state = np.minimum(bets_by_state, table_max)
+    minimum_equity = table_min or 0.0
+    next_state = np.stack([strategy.on_loss, strategy.on_win])
+
+    state = np.zeros(num_sessions, dtype=np.int32)
+    equity = np.full(num_sessions, float(bankroll))
+    peak = equity.copy()
+    max_drawdown = np.zeros(num_sessions)
+    wagered = np.zeros(num_sessions)
+    losing_streak = np.zeros(num_sessions, dtype=np.int32)
+    longest = np.zeros(num_sessions, dtype=np.int32)
+    ruin_round = np.full(num_sessions, num_rounds)
+    streak_counts = np.zeros(1, dtype=np.int64)
+    trace = {'session': [], 'round': [], 'spin': [], 'bet': [], 'won': [], 'equity': []}
+    active = np.arange(num_sessions)
+
+    def count_streaks(lengths):
+        nonlocal streak_counts
+        if len(lengths):
+            streak_counts = add_counts(streak_counts, np.bincount(lengths))
+
+    for block_start in range(0, num_rounds, ROUND_BLOCK):
+        if not len(active):
+            break
+        width = min(ROUND_BLOCK, num_rounds - block_start)
+        spins = rng.integers(0, WHEEL_POCKETS[wheel], size=(width, len(active)), dtype=np.uint8)
+        wins = red[spins]
+        # Active sessions stay in order, so the traced ones are always at the front
+        traced = np.searchsorted(active, trace_sessions)
+
+        block_state, block_equity, block_peak = state[active], equity[active], peak[active]
+        block_drawdown, block_wagered = max_drawdown[active], wagered[active]
+        block_streak, block_longest = losing_streak[active], longest[active]
+        block_ruin = ruin_round[active]
+        alive = np.ones(len(active), dtype=bool)
+
+        for offset in range(width):
+            bets = bets_by_state[block_state]
+            broke = alive & ((bets > block_equity) | (block_equity < minimum_equity))
+            if broke.any():
+                block_ruin[broke] = block_start + offset
+                count_streaks(block_streak[broke & (block_streak > 0)])
+                alive &= ~broke
+
+            won = wins[offset] & alive
+            lost = ~wins[offset] & alive
+            block_equity += bets * won - bets * lost
+            block_wagered += bets * alive
+            block_state = np.where(alive, next_state[won.view(np.uint8), block_state], block_state)
+
+            np.maximum(block_peak, block_equity, out=block_peak)
+            np.maximum(block_drawdown, block_peak - block_equity, out=block_drawdown)
+            count_streaks(block_streak[won & (block_streak > 0)])
+            block_streak = (block_streak + lost) * ~won
+            np.maximum(block_longest, block_streak, out=block_longest)
+
+            if traced:
+                played = alive[:traced]
+                trace['session'].append(active[:traced][played])
+                trace['round'].append(np.full(played.sum(), block_start + offset + 1, dtype=np.int32))
+                trace['spin'].append(spins[offset, :traced][played])
+                trace['bet'].append(bets[:traced][played])
+                trace['won'].append(won[:traced][played])
+                trace['equity'].append(block_equity[:traced][played])
+
+        state[active], equity[active], peak[active] = block_state, block_equity, block_peak
+        max_drawdown[active], wagered[active] = block_drawdown, block_wagered
+        losing_streak[active], longest[active] = block_streak, block_longest
+        ruin_round[active] = block_ruin
+        active = active[alive]
+
+    # Streaks still running when the rounds ran out
+    count_streaks(losing_streak[active][losing_streak[active] > 0])
+
+    return {
+        'final_pnl': equity - bankroll,
+        'max_drawdown': max_drawdown,
+        'wagered': wagered,
+        'ruined': ruin_round < num_rounds,
+        'ruin_round': ruin_round,
+        'longest_losing_streak': longest,
+        'streak_counts': streak_counts,
+        'trace': {name: np.concatenate(parts) if parts else np.empty(0) for name, parts in trace.items()},
+    }
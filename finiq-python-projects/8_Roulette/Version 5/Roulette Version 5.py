@@ -1,6 +1,8 @@
 import random
 import csv
 
+RED_NUMBERS = {1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36}
+
 def martingale_simulator(max_rounds=10, csv_filename="martingale_results.csv"):
     current_bet = 10  # Initial bet amount
     total_bets = 0
@@ -22,12 +24,12 @@ def martingale_simulator(max_rounds=10, csv_filename="martingale_results.csv"):
             net_profit_loss -= current_bet
             
             # Simulate roulette spin
-            roulette_spin = random.randint(0, 37)  # 0 represents green, 1-18 red, 19-36 black
+            roulette_spin = random.randint(0, 36)  # European wheel: 0 is green, 18 red and 18 black numbers
             
             if roulette_spin == 0:
                 spin_result = "Green 0"
                 color_result = "Green"
-            elif roulette_spin <= 18:
+            elif roulette_spin in RED_NUMBERS:
                 spin_result = f"Red {roulette_spin}"
                 color_result = "Red"
             else:
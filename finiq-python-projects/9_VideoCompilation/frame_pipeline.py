@@ -0,0 +1,101 @@
+"""
+Captioned image -> video pipeline shared by create_video_with_captions.py and create_video_with_captions_v3.py.
+
+Images are opened and captioned (the file name, top right) in a pool of worker processes, and the
+finished frames go through a bounded queue to a single encoder thread that owns the cv2.VideoWriter.
+Frames are queued in the order the images were given, so the video keeps that order, and at most
+queue_frames frames are waiting or being captioned at a time, so memory stays flat on large folders.
+
+Scripts using it need an `if __name__ == "__main__":` guard: on Windows the workers re-import the script.
+"""
+
+import functools
+import os
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# Frames allowed in flight (being captioned) and waiting for the encoder, each
+QUEUE_FRAMES = 32
+CAPTION_MARGIN = 10  # pixels from the top and right edges
+
+
+@functools.lru_cache(maxsize=None)
+def load_font(font_path=None, font_size=30):
+    # Loaded once per worker process; no path means Pillow's default font
+    if font_path is None:
+        return ImageFont.load_default()
+    return ImageFont.truetype(font_path, font_size)
+
+
+def caption_image(image_path, text, font_path=None, font_size=30):
+    image = Image.open(image_path)
+    font = load_font(font_path, font_size)
+
+    # Draw the caption in the top right corner
+    draw = ImageDraw.Draw(image)
+    text_bbox = draw.textbbox((0, 0), text, font=font)
+    text_width = text_bbox[2] - text_bbox[0]
+    x = image.width - text_width - CAPTION_MARGIN
+    draw.text((x, CAPTION_MARGIN), text, font=font, fill="white")
+
+    # Convert PIL image to OpenCV format
+    return cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+
+
+def write_video(image_paths, output_path, fps, frames_per_image, font_path=None, font_size=30,
+                workers=None, queue_frames=QUEUE_FRAMES, on_frame=None):
+    """
+    Caption every image with its file name and write it frames_per_image times to output_path, in order.
+    on_frame(image_path, frame) is called from the encoder thread before each image is written.
+    """
+    width, height = Image.open(image_paths[0]).size
+    fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Codec for MP4
+    video_writer = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
+    frames = queue.Queue(maxsize=queue_frames)
+    errors = []
+
+    def encode():
+        # The only thread touching the writer; after an error it keeps draining so the producer never blocks
+        while (item := frames.get()) is not None:
+            if errors:
+                continue
+            image_path, frame = item
+            try:
+                if on_frame:
+                    on_frame(image_path, frame)
+                for _ in range(frames_per_image):
+                    video_writer.write(frame)
+            except Exception as exc:
+                errors.append(exc)
+
+    encoder = threading.Thread(target=encode, name="video-encoder")
+    encoder.start()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Futures are handed to the encoder oldest first, which keeps the images in order
+            pending = deque()
+            for image_path in image_paths:
+                text = os.path.basename(image_path)
+                pending.append((image_path, executor.submit(caption_image, image_path, text, font_path, font_size)))
+                if len(pending) >= queue_frames:
+                    done_path, future = pending.popleft()
+                    frames.put((done_path, future.result()))
+                if errors:
+                    break
+            while pending and not errors:
+                done_path, future = pending.popleft()
+                frames.put((done_path, future.result()))
+            for _, future in pending:
+                future.cancel()
+    finally:
+        frames.put(None)
+        encoder.join()
+        video_writer.release()
+    if errors:
+        raise errors[0]
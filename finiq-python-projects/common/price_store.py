@@ -0,0 +1,160 @@
+"""
+Local on-disk cache of daily OHLCV prices shared by the FinIQ scripts.
+
+Each ticker is kept in its own .npz file (int64 dates + one float64 array per column)
+together with the date range that has already been fetched. A request only goes to the
+network for the part of [start, end) that is not on disk yet; everything else is served
+from the file.
+
+A fetch that comes back empty (Yahoo does that when throttled, offline or given a bad ticker)
+never counts as covered, so it is tried again next time. New pieces are fetched overlapping
+the cached dates by a few days: if Close or Adj Close changed there (a split or dividend since
+the cache was written), the whole range is downloaded again rather than mixing two adjustment bases.
+
+The fetcher is pluggable: anything callable as fetcher(ticker, start, end) that returns a
+DataFrame indexed by date works, e.g. csv_fetcher() for offline runs against fixture files.
+
+    import price_store
+    stock_data = price_store.download('AAPL', start='2022-01-01', end='2023-01-01')
+"""
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_DIR = os.environ.get('FINIQ_PRICE_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'finiq', 'prices'))
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+# Columns whose history is rewritten by splits and dividends
+ADJUSTED_COLUMNS = ['Close', 'Adj Close']
+# How far a new piece reaches back into the cached dates (enough to span weekends and holidays)
+OVERLAP = pd.Timedelta(days=10)
+# yf.download keeps its results in module-global state, so two downloads must never overlap
+YAHOO_LOCK = threading.Lock()
+
+
+def yahoo_fetcher(ticker, start, end):
+    import yfinance as yf
+
+    with YAHOO_LOCK:
+        data = yf.download(ticker, start=start, end=end, auto_adjust=False, progress=False)
+    # Newer yfinance versions return (field, ticker) columns even for a single ticker
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = data.columns.get_level_values(0)
+    return data
+
+
+def csv_fetcher(directory):
+    """Fetcher reading <directory>/<ticker>.csv files (Date column + OHLCV) instead of Yahoo."""
+    def fetch(ticker, start, end):
+        data = pd.read_csv(os.path.join(directory, f'{ticker}.csv'), index_col='Date', parse_dates=True)
+        return data[(data.index >= start) & (data.index < end)]
+    return fetch
+
+
+class PriceStore:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, fetcher=yahoo_fetcher):
+        self.cache_dir = cache_dir
+        self.fetcher = fetcher
+
+    def _path(self, ticker):
+        safe_name = ticker.replace('/', '_').replace('^', '_')
+        return os.path.join(self.cache_dir, f'{safe_name}.npz')
+
+    def _load(self, ticker):
+        path = self._path(ticker)
+        if not os.path.exists(path):
+            return None, None, None
+        with np.load(path) as stored:
+            index = pd.DatetimeIndex(stored['dates'].astype('datetime64[ns]'), name='Date')
+            data = pd.DataFrame({column: stored[column] for column in COLUMNS if column in stored}, index=index)
+            covered_start = pd.Timestamp(int(stored['covered'][0]))
+            covered_end = pd.Timestamp(int(stored['covered'][1]))
+        return data, covered_start, covered_end
+
+    def _save(self, ticker, data, covered_start, covered_end):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        arrays = {column: data[column].to_numpy(dtype=float) for column in COLUMNS if column in data}
+        arrays['dates'] = data.index.values.astype('datetime64[ns]').astype(np.int64)
+        arrays['covered'] = np.array([covered_start.value, covered_end.value], dtype=np.int64)
+
+        # Write next to the target and rename so a reader never sees a half-written file
+        path = self._path(ticker)
+        temp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(temp_path, **arrays)
+        os.replace(temp_path, path)
+
+    def _fetch(self, ticker, start, end):
+        data = self.fetcher(ticker, start, end)
+        if data is None or data.empty:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name='Date'))
+        data = data[[column for column in COLUMNS if column in data]]
+        data.index = pd.DatetimeIndex(data.index).tz_localize(None).normalize()
+        return data
+
+    def _same_adjustment(self, cached, piece):
+        """True when cached and piece agree on the prices of the dates they share."""
+        common = cached.index.intersection(piece.index)
+        columns = [column for column in ADJUSTED_COLUMNS if column in cached and column in piece]
+        if common.empty:
+            return False
+        return np.allclose(cached.loc[common, columns].to_numpy(dtype=float), piece.loc[common, columns].to_numpy(dtype=float),
+                           rtol=1e-6, equal_nan=True)
+
+    def download(self, ticker, start, end=None):
+        """Return daily prices for [start, end), fetching only the dates not cached yet."""
+        today = pd.Timestamp.now().normalize()
+        start = pd.Timestamp(start).normalize()
+        end = today if end is None else pd.Timestamp(end).normalize()
+        # Never mark days that have not traded yet as covered
+        fetch_end = min(end, today)
+
+        data, covered_start, covered_end = self._load(ticker)
+        if data is None:
+            data = self._fetch(ticker, start, fetch_end)
+            # Nothing came back: don't remember the range as covered
+            if not data.empty:
+                self._save(ticker, data, start, fetch_end)
+        else:
+            # Each piece overlaps the cached dates, so an empty piece means the fetch failed
+            pieces = []
+            new_start, new_end = covered_start, covered_end
+            if start < covered_start:
+                piece = self._fetch(ticker, start, covered_start + OVERLAP)
+                if not piece.empty:
+                    pieces.append(piece)
+                    new_start = start
+            if fetch_end > covered_end:
+                piece = self._fetch(ticker, covered_end - OVERLAP, fetch_end)
+                if not piece.empty:
+                    pieces.append(piece)
+                    new_end = fetch_end
+            if pieces:
+                if all(self._same_adjustment(data, piece) for piece in pieces):
+                    data = pd.concat([data] + pieces)
+                    data = data[~data.index.duplicated(keep='last')].sort_index()
+                    self._save(ticker, data, new_start, new_end)
+                else:
+                    # Adjusted since the cache was written: replace it with one consistent download
+                    full = self._fetch(ticker, new_start, new_end)
+                    if not full.empty:
+                        data = full
+                        self._save(ticker, data, new_start, new_end)
+
+        return data[(data.index >= start) & (data.index < end)].copy()
+
+
+_default_store = None
+
+
+def get_default_store():
+    global _default_store
+    if _default_store is None:
+        _default_store = PriceStore()
+    return _default_store
+
+
+def download(ticker, start, end=None):
+    """Drop-in replacement for yf.download(ticker, start=..., end=...) backed by the default store."""
+    return get_default_store().download(ticker, start, end)
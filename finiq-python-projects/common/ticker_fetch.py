@@ -0,0 +1,104 @@
+"""
+Concurrent history + metadata loader for many tickers at once.
+
+Company info is fetched on a bounded thread pool. Yahoo price histories are fetched one
+ticker at a time: yf.download shares module-global state between calls and the local price
+store has no per-ticker locking, so concurrent downloads could mix up tickers. Each source
+(history, info) has its own rate limiter so a slow or throttled endpoint such as Yahoo's
+quote summary does not get hammered; pass None to turn one off. Price histories come back
+as one wide DataFrame (one column per ticker, aligned on date).
+
+Fetchers are plain callables, so a mock can be passed in to run without the network:
+
+    prices, names = fetch_tickers(['AAPL', 'MSFT'], history_fetcher=fake_history, info_fetcher=fake_info)
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import price_store
+
+# Held around every default history fetch (price store read, download and write)
+HISTORY_LOCK = threading.Lock()
+
+
+class RateLimiter:
+    """Spaces calls at least 1 / calls_per_second apart across all threads."""
+
+    def __init__(self, calls_per_second=None):
+        self.interval = 1.0 / calls_per_second if calls_per_second else 0.0
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            start_time = max(self.next_time, now)
+            self.next_time = start_time + self.interval
+        time.sleep(max(0.0, start_time - now))
+
+
+def yahoo_history(symbol, years=10):
+    # Served from the local price store, so only new days hit Yahoo
+    start_date = pd.Timestamp.now() - pd.DateOffset(years=years)
+    with HISTORY_LOCK:
+        return price_store.download(symbol, start=start_date)['Adj Close']
+
+
+def yahoo_info(symbol):
+    import yfinance as yf
+
+    return yf.Ticker(symbol).info
+
+
+def fetch_tickers(symbols, history_fetcher=yahoo_history, info_fetcher=yahoo_info, max_workers=8,
+                  history_calls_per_second=2, info_calls_per_second=2):
+    """
+    Return (prices, names): a date x symbol DataFrame of prices and a symbol -> company name dict.
+
+    A symbol whose info lookup fails falls back to the symbol itself as its name; a symbol
+    whose history fails is left out of the price frame.
+    """
+    history_limiter = RateLimiter(history_calls_per_second)
+    info_limiter = RateLimiter(info_calls_per_second)
+
+    def load_history(symbol):
+        history_limiter.wait()
+        return history_fetcher(symbol)
+
+    def load_name(symbol):
+        info_limiter.wait()
+        info = info_fetcher(symbol) or {}
+        return info.get('longName') or info.get('shortName') or symbol
+
+    # Yahoo histories run one at a time on their own thread so they don't tie up the info pool
+    history_workers = 1 if history_fetcher is yahoo_history else max_workers
+    with ThreadPoolExecutor(max_workers=history_workers) as history_executor, \
+            ThreadPoolExecutor(max_workers=max_workers) as executor:
+        history_futures = {symbol: history_executor.submit(load_history, symbol) for symbol in symbols}
+        name_futures = {symbol: executor.submit(load_name, symbol) for symbol in symbols}
+
+        histories = {}
+        for symbol, future in history_futures.items():
+            try:
+                histories[symbol] = future.result()
+            except Exception as error:
+                print(f'Could not load history for {symbol}: {error}')
+
+        names = {}
+        for symbol, future in name_futures.items():
+            try:
+                names[symbol] = future.result()
+            except Exception:
+                names[symbol] = symbol
+
+    if not histories:
+        return pd.DataFrame(), names
+
+    prices = pd.concat(histories, axis=1).sort_index()
+    return prices, names